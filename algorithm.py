@@ -1,16 +1,122 @@
 import argparse
-import sys
+import multiprocessing
 import time
-import networkx as nx
-import matplotlib.pyplot as plt
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional, Iterable, Hashable
+from transposition import TranspositionTable, pack_key
+from evaluators import DEFAULT_EVALUATORS, evaluate
+from canonical_labeling import canonical_ids_for
+from tablebase import Tablebase, open_tablebase
+
+_progress = {'top_level': 1000, 'count': 0, 'start_time': None, 'nodes': 0}
+# Loops are treated as edges to this extra vertex when peeling the 2-core.
+_GROUND = object()
+
+class EdgeGraph:
+    """An undirected multigraph as adjacency counts, for the search.
+
+    Holds the part of networkx's graph interface the solver uses, without
+    its per-call overhead or import cost. Edges may repeat and may be
+    loops; `adjacency[v][n]` is the number of edges between `v` and `n`,
+    each loop counted once.
+    """
 
-_progress = {'top_level': 1000, 'count': 0, 'start_time': None}
+    def __init__(self,
+                 edges: Iterable[Tuple[Hashable, Hashable]] = (),
+                 nodes: Iterable[Hashable] = ()) -> None:
+        self.adjacency: Dict[Hashable, Dict[Hashable, int]] = {}
+        self._num_edges = 0
+        self.add_nodes_from(nodes)
+        for v0, v1 in edges:
+            self.add_edge(v0, v1)
+
+    @classmethod
+    def from_networkx(cls, graph) -> 'EdgeGraph':
+        return cls(graph.edges(), graph.nodes())
+
+    def __contains__(self, v: Hashable) -> bool:
+        return v in self.adjacency
+
+    def add_node(self, v: Hashable) -> None:
+        self.adjacency.setdefault(v, {})
+
+    def add_nodes_from(self, nodes: Iterable[Hashable]) -> None:
+        for v in nodes:
+            self.adjacency.setdefault(v, {})
+
+    def add_edge(self, v0: Hashable, v1: Hashable) -> None:
+        neighbors0 = self.adjacency.setdefault(v0, {})
+        neighbors0[v1] = neighbors0.get(v1, 0) + 1
+        if v1 != v0:
+            neighbors1 = self.adjacency.setdefault(v1, {})
+            neighbors1[v0] = neighbors1.get(v0, 0) + 1
+        self._num_edges += 1
+
+    def remove_edge(self, v0: Hashable, v1: Hashable) -> None:
+        for v, n in ((v0, v1), (v1, v0)) if v1 != v0 else ((v0, v0),):
+            count = self.adjacency[v][n] - 1
+            if count:
+                self.adjacency[v][n] = count
+            else:
+                del self.adjacency[v][n]
+        self._num_edges -= 1
+
+    def remove_nodes_from(self, nodes: Iterable[Hashable]) -> None:
+        for v in nodes:
+            for n, count in self.adjacency.pop(v).items():
+                if n != v:
+                    del self.adjacency[n][v]
+                self._num_edges -= count
+
+    def nodes(self) -> List[Hashable]:
+        return list(self.adjacency)
+
+    def edges(self) -> List[Tuple[Hashable, Hashable]]:
+        # Each edge once, repeats included, in the order networkx lists a
+        # multigraph's edges.
+        edges: List[Tuple[Hashable, Hashable]] = []
+        seen = set()
+        for v, neighbors in self.adjacency.items():
+            for n, count in neighbors.items():
+                if n not in seen:
+                    edges.extend([(v, n)] * count)
+            seen.add(v)
+        return edges
+
+    def neighbors(self, v: Hashable) -> Iterable[Hashable]:
+        return self.adjacency[v].keys()
+
+    def degree(self, v: Hashable) -> int:
+        # A loop adds two to its vertex's degree, as in networkx.
+        neighbors = self.adjacency[v]
+        return sum(neighbors.values()) + neighbors.get(v, 0)
+
+    def number_of_nodes(self) -> int:
+        return len(self.adjacency)
+
+    def number_of_edges(self,
+                        v0: Optional[Hashable] = None,
+                        v1: Optional[Hashable] = None) -> int:
+        if v0 is None:
+            return self._num_edges
+        return self.adjacency.get(v0, {}).get(v1, 0)
+
+    def nodes_with_selfloops(self) -> List[Hashable]:
+        return [v for v, neighbors in self.adjacency.items() if v in neighbors]
+
+    def number_of_selfloops(self) -> int:
+        return sum(
+            neighbors.get(v, 0) for v, neighbors in self.adjacency.items()
+        )
 
 class Vertex:
-    def __init__(self, raw_id: int, graph: nx.Graph) -> None:
+    def __init__(self, raw_id: int, graph: EdgeGraph) -> None:
         self.raw_id = raw_id
-        self.neighbors = list(graph.neighbors(raw_id))
+        # A multigraph's parallel edges (such as two loops on one vertex)
+        # each count as a neighbor.
+        self.neighbors = [
+            n for n, count in graph.adjacency[raw_id].items()
+            for _ in range(count)
+        ]
         self.num_neighbors = len(self.neighbors)
         self.num_loops = sum(1 for n in self.neighbors if n == raw_id)
         self.canonical_id: int = -1
@@ -19,7 +125,7 @@ class Vertex:
         self.prior_category: int = -1
 
 class CanonicalEdges:
-    def __init__(self, graph: nx.Graph) -> None:
+    def __init__(self, graph: EdgeGraph) -> None:
         self.graph = graph
         self._init_vertices()
 
@@ -161,19 +267,64 @@ class CanonicalEdges:
                 not_connected_to_canonical_id.append(v)
         return (connected_to_canonical_id, not_connected_to_canonical_id)
 
-def run(graph: nx.Graph) -> None:
-    global _progress
-    memo = {}
-    draw_and_save_graph(graph)
-    _progress['start_time'] = time.perf_counter()
-    
-    # Using the CanonicalEdges directly with the graph object now.
-    canonical_edge_list = CanonicalEdges(graph).calc()
-    net_score = _net_score(graph=graph, depth=0, memo=memo)
+def canonicalize_refine(
+    graph: EdgeGraph
+) -> Tuple[List[Tuple[int, int]], Dict]:
+    canonical_edges = CanonicalEdges(graph)
+    canonical_edge_list = canonical_edges.calc()
+    return (canonical_edge_list, {
+        raw_id: v.canonical_id for raw_id, v in canonical_edges.vertices.items()
+    })
+
+def canonicalize_ir(graph: EdgeGraph) -> Tuple[List[Tuple[int, int]], Dict]:
+    return canonical_ids_for(list(graph.edges()))
+
+# Each returns the canonical edge list and the canonical id of each vertex.
+CANONICALIZERS = {'refine': canonicalize_refine, 'ir': canonicalize_ir}
+
+def run(graph: EdgeGraph, canonicalizer: str = 'refine',
+        max_memo_entries: Optional[int] = None,
+        max_memo_bytes: Optional[int] = None,
+        draw: bool = False) -> None:
+    memo = TranspositionTable(max_memo_entries, max_memo_bytes)
+    drawing = start_drawing(graph) if draw else None
+    net_score = solve(
+        graph, memo, canonicalizer, open_tablebase('tablebase.bin')
+    )
     # Calculate each player's score based on the net score
     first_player_score = (graph.number_of_nodes() + net_score) // 2
     second_player_score = (graph.number_of_nodes() - net_score) // 2
     print_scores(first_player_score, second_player_score)
+    print(memo.hit_summary())
+    print(f'nodes:{_progress["nodes"]}')
+    if drawing is not None:
+        drawing.join()
+
+def solve(graph: EdgeGraph, memo: TranspositionTable,
+          canonicalizer: str = 'refine',
+          tablebase: Optional[Tablebase] = None,
+          show_progress: bool = True) -> int:
+    """The net score of `graph` for the first player, searched against
+    `memo`. The count of positions visited is left in `_progress`."""
+    global _progress
+    _progress['top_level'] = 1000 if show_progress else -1
+    _progress['count'] = 0
+    _progress['start_time'] = time.perf_counter()
+    _progress['nodes'] = 0
+    return _net_score(
+        graph=graph,
+        depth=0,
+        memo=memo,
+        canonicalize=CANONICALIZERS[canonicalizer],
+        core=_peel_core(
+            graph,
+            frozenset(graph.nodes()) | {_GROUND},
+            list(graph.nodes()) + [_GROUND]
+        ),
+        alpha=-1 * graph.number_of_nodes(),
+        beta=graph.number_of_nodes(),
+        tablebase=tablebase
+    )
 
 def print_scores(first_player_score: int, second_player_score: int) -> None:
     if first_player_score > second_player_score:
@@ -183,71 +334,255 @@ def print_scores(first_player_score: int, second_player_score: int) -> None:
     else:
         print('Tie game!')
 
-def _net_score(graph: nx.Graph, depth: int, memo: dict) -> int:
-    #graph_key = nx.weisfeiler_lehman_graph_hash(graph)
-    #graph_key = build_graph_key(graph)
-    # Conversion to canonical edges for memoization
-    canonical_edge_list = CanonicalEdges(graph).calc()
-    graph_key = str(canonical_edge_list)
+class _SearchFrame:
+    """A position on the search stack: its window, moves and best so far.
 
-    if graph_key in memo:
-        return memo[graph_key]
-    
-    if nx.is_forest(graph):
-        # Edge case for trees where the sequence of moves leading to realizing it's a tree is relevant.
-        memo[graph_key] = graph.number_of_nodes()
-        return graph.number_of_nodes()
+    `move`, `points` and `removed` describe the move whose child is being
+    searched, so it can be unmade when the child's value comes back.
+    """
+    __slots__ = (
+        'depth', 'core', 'alpha', 'beta', 'window', 'graph_key',
+        'canonical_ids', 'edges', 'next_edge', 'tried_edges',
+        'best_outcome', 'best_move', 'num_edges', 'move', 'points', 'removed'
+    )
 
-    best_outcome = -1 * graph.number_of_nodes()  # Initialize with the worst possible score
-    
-    tried_edges = []
-    for e in graph.edges:
-        if e in tried_edges:
-            continue
-        tried_edges.append(e)
-        # Each edge considered for cutting creates a new branch of exploration with its own sequence.
-        test_graph = graph.copy()
-        if e[0] != e[1]:
-            if test_graph.degree(e[0]) == 1 and test_graph.degree(e[1]) == 1:
-                points = 2
-                test_graph.remove_edge(*e)
-                test_graph.remove_node(e[0])
-                test_graph.remove_node(e[1])
-            elif test_graph.degree(e[0]) == 1:
-                points = 1
-                test_graph.remove_edge(*e)
-                test_graph.remove_node(e[0])
-            elif graph.degree(e[1]) == 1:
-                points = 1
-                test_graph.remove_edge(*e)
-                test_graph.remove_node(e[1])
-            else:
-                points = 0
-                test_graph.remove_edge(*e)
-        else:
-            if test_graph.degree(e[0]) == 2:
-                points = 1
-                test_graph.remove_edge(*e)
-                test_graph.remove_node(e[0])
+    def __init__(self, depth: int, core: frozenset, alpha: int, beta: int,
+                 graph_key: bytes, canonical_ids: Dict, edges: List,
+                 num_nodes: int, num_edges: int) -> None:
+        self.depth = depth
+        self.core = core
+        self.alpha = alpha
+        self.beta = beta
+        self.window = (alpha, beta)
+        self.graph_key = graph_key
+        self.canonical_ids = canonical_ids
+        self.edges = edges
+        self.next_edge = 0
+        self.tried_edges = set()
+        self.best_outcome = -1 * num_nodes  # The worst possible score
+        self.best_move = None
+        self.num_edges = num_edges
+        self.move = None
+        self.points = 0
+        self.removed: List = []
+
+    def canonical_move(self, e: Tuple[int, int]) -> Tuple[int, int]:
+        # Moves are memoized in canonical labels.
+        return tuple(sorted(
+            (self.canonical_ids[e[0]], self.canonical_ids[e[1]])
+        ))
+
+    def add_outcome(self, e: Tuple[int, int], outcome: int) -> bool:
+        """Record a move's outcome; True when it cuts the search off."""
+        if self.best_move is None or outcome > self.best_outcome:
+            self.best_outcome = outcome
+            self.best_move = self.canonical_move(e)
+            if outcome > self.alpha:
+                self.alpha = outcome
+                if self.alpha >= self.beta:
+                    return True
+        return False
+
+def _net_score(graph: EdgeGraph, depth: int, memo: TranspositionTable,
+               canonicalize, core: frozenset, alpha: int, beta: int,
+               tablebase: Optional[Tablebase] = None) -> int:
+    # Positions are searched from an explicit stack rather than by
+    # recursion, and every move is made on `graph` itself and unmade when
+    # its child has been searched, so `graph` is left as it was found.
+    # Unmaking moves reorders the graph's edges, so moves are tried in the
+    # order the edges had here instead.
+    edge_rank = {}
+    for e in graph.edges():
+        edge_rank.setdefault(e, len(edge_rank))
+        edge_rank.setdefault((e[1], e[0]), edge_rank[e])
+    entered = _enter_position(
+        graph, depth, memo, canonicalize, core, alpha, beta, edge_rank,
+        tablebase
+    )
+    if not isinstance(entered, _SearchFrame):
+        return entered
+    stack = [entered]
+    while True:
+        frame = stack[-1]
+        child = None
+        while child is None and frame.next_edge < len(frame.edges):
+            e = frame.edges[frame.next_edge]
+            frame.next_edge += 1
+            if e in frame.tried_edges:
+                continue
+            frame.tried_edges.add(e)
+            # Each edge considered for cutting creates a new branch of
+            # exploration with its own sequence.
+            points, removed = _make_move(graph, e)
+
+            # The 2-core only changes when the cut edge was part of it.
+            child_core = frame.core
+            end = e[1] if e[1] != e[0] else _GROUND
+            if e[0] in frame.core and end in frame.core:
+                child_core = _peel_core(graph, frame.core, [e[0], end])
+
+            # A capture keeps the turn, so the window only shifts by the
+            # points taken; otherwise the opponent searches the negated
+            # window.
+            if graph.number_of_nodes() == 0:
+                child = 0
+            elif points > 0:
+                child = _enter_position(
+                    graph, frame.depth + 1, memo, canonicalize, child_core,
+                    frame.alpha - points, frame.beta - points, edge_rank,
+                    tablebase
+                )
             else:
-                points = 0
-                test_graph.remove_edge(*e)
+                child = _enter_position(
+                    graph, frame.depth + 1, memo, canonicalize, child_core,
+                    -1 * frame.beta, -1 * frame.alpha, edge_rank, tablebase
+                )
+            if isinstance(child, _SearchFrame):
+                frame.move = e
+                frame.points = points
+                frame.removed = removed
+                stack.append(child)
+                break
+            _unmake_move(graph, e, removed)
+            outcome = points + child if points > 0 else -1 * child
+            if frame.add_outcome(e, outcome):
+                frame.next_edge = len(frame.edges)
+            child = None
+        if child is not None:
+            continue
 
-        mult = 1 if points > 0 else -1
-        if test_graph.number_of_nodes() > 0:
-            outcome = points + mult * _net_score(test_graph, depth + 1, memo)
+        # Every move is searched (or cut off), so the position is done.
+        _track_progress(frame.depth)
+        memo.store(
+            frame.graph_key, frame.best_outcome, frame.num_edges,
+            *frame.window, frame.best_move
+        )
+        value = frame.best_outcome
+        stack.pop()
+        if not stack:
+            return value
+        parent = stack[-1]
+        _unmake_move(graph, parent.move, parent.removed)
+        if parent.points > 0:
+            outcome = parent.points + value
         else:
-            outcome = points
+            outcome = -1 * value
+        if parent.add_outcome(parent.move, outcome):
+            parent.next_edge = len(parent.edges)
+
+def _enter_position(graph: EdgeGraph, depth: int, memo: TranspositionTable,
+                    canonicalize, core: frozenset, alpha: int, beta: int,
+                    edge_rank: Dict, tablebase: Optional[Tablebase] = None):
+    """The position's net score if it's settled without a search, or else
+    a `_SearchFrame` to search it from."""
+    _progress['nodes'] += 1
+    if not core:
+        # Edge case for trees where the sequence of moves leading to realizing it's a tree is relevant.
+        # An empty 2-core means every component is a tree with at most one loop.
+        return graph.number_of_nodes()
+
+    value = evaluate(
+        DEFAULT_EVALUATORS,
+        graph.number_of_edges(),
+        graph.number_of_nodes(),
+        graph.number_of_selfloops(),
+        lambda: list(graph.edges())
+    )
+    if value is not None:
+        return value
 
-        if (outcome > best_outcome):
-            best_outcome = outcome
-            if outcome == graph.number_of_nodes():
+    # Conversion to canonical edges for memoization
+    canonical_edge_list, canonical_ids = canonicalize(graph)
+    graph_key = pack_key(canonical_edge_list)
+
+    # The memo may only hold a bound from a search that failed high or low;
+    # that is enough to cut off here or to narrow the window.
+    alpha = max(alpha, -1 * graph.number_of_nodes())
+    beta = min(beta, graph.number_of_nodes())
+    probe = memo.probe(graph_key, graph.number_of_edges(), alpha, beta)
+    if probe.value is not None:
+        return probe.value
+    # Small positions are looked up once the memo has missed, and stored
+    # there as exact.
+    if tablebase is not None and tablebase.covers(
+        graph.number_of_nodes(), graph.number_of_edges()
+    ):
+        value = tablebase.get(list(graph.edges()))
+        if value is not None:
+            memo.store(
+                graph_key, value, graph.number_of_edges(),
+                -1 * graph.number_of_nodes() - 1,
+                graph.number_of_nodes() + 1, None
+            )
+            return value
+    frame = _SearchFrame(
+        depth, core, probe.alpha, probe.beta, graph_key, canonical_ids,
+        sorted(graph.edges(), key=edge_rank.__getitem__),
+        graph.number_of_nodes(), graph.number_of_edges()
+    )
+    if probe.best_move is not None:
+        for e in frame.edges:
+            if frame.canonical_move(e) == probe.best_move:
+                frame.edges.insert(0, e)
                 break
-    
-    # Before returning, ensure this best outcome and its sequence is memoized to avoid re-computation.
-    _track_progress(depth)
-    memo[graph_key] = best_outcome
-    return best_outcome
+    return frame
+
+def _make_move(graph: EdgeGraph, e: Tuple[int, int]) -> Tuple[int, List]:
+    """Cut `e` from `graph`, returning the points and the vertices captured."""
+    if e[0] != e[1]:
+        if graph.degree(e[0]) == 1 and graph.degree(e[1]) == 1:
+            removed = [e[0], e[1]]
+        elif graph.degree(e[0]) == 1:
+            removed = [e[0]]
+        elif graph.degree(e[1]) == 1:
+            removed = [e[1]]
+        else:
+            removed = []
+    elif graph.degree(e[0]) == 2:
+        removed = [e[0]]
+    else:
+        removed = []
+    graph.remove_edge(*e)
+    graph.remove_nodes_from(removed)
+    return (len(removed), removed)
+
+def _unmake_move(graph: EdgeGraph, e: Tuple[int, int], removed: List) -> None:
+    graph.add_nodes_from(removed)
+    graph.add_edge(*e)
+
+def _peel_core(graph: EdgeGraph, core: frozenset, ends: list) -> frozenset:
+    # Vertices of the 2-core of the graph with loops turned into edges to
+    # _GROUND. Only vertices reachable from `ends` through peeled vertices
+    # are revisited, so the cost is proportional to what gets peeled.
+    core = set(core)
+    while ends:
+        vertex = ends.pop()
+        if vertex in core:
+            degree, neighbor = _core_degree(graph, core, vertex)
+            if degree <= 1:
+                core.remove(vertex)
+                if neighbor is not None:
+                    ends.append(neighbor)
+    return frozenset(core)
+
+def _core_degree(graph: EdgeGraph, core: set, vertex) -> Tuple[int, object]:
+    degree = 0
+    neighbor = None
+    if vertex is _GROUND:
+        for v in graph.nodes_with_selfloops():
+            if v in core:
+                degree += graph.number_of_edges(v, v)
+                neighbor = v
+    elif vertex in graph:
+        for n in graph.neighbors(vertex):
+            if n == vertex:
+                if _GROUND in core:
+                    degree += graph.number_of_edges(n, n)
+                    neighbor = _GROUND
+            elif n in core:
+                degree += graph.number_of_edges(vertex, n)
+                neighbor = n
+    return (degree, neighbor)
 
 def _track_progress(depth: int) -> None:
     global _progress
@@ -264,27 +599,33 @@ def _track_progress(depth: int) -> None:
             f'seconds:{elapsed_secs:.2f}'
         )
 
-def build_graph_key(graph: nx.Graph) -> str:
-    # Use a combination of graph invariants to generate a more unique key.
-    # This includes degree sequences, but also other structural properties.
-    degrees = tuple(sorted(dict(graph.degree()).values()))
-    edges = tuple(sorted(map(sorted, graph.edges())))
-    num_nodes = graph.number_of_nodes()
-    # Example addition: Number of connected components could also influence outcomes.
-    num_components = nx.number_connected_components(graph)
-    
-    # Serialize this information into a string key.
-    key = f"{degrees}-{edges}-{num_nodes}-{num_components}"
-    return key
-
-def draw_and_save_graph(graph: nx.Graph) -> None:
+def start_drawing(graph: EdgeGraph,
+                  path: str = 'graph.png') -> multiprocessing.Process:
+    """Draw `graph` to `path` in a background process, so the solver
+    neither waits for it nor imports the plotting libraries."""
+    process = multiprocessing.Process(
+        target=draw_and_save_graph, args=(graph.edges(), graph.nodes(), path)
+    )
+    process.start()
+    return process
+
+def draw_and_save_graph(edges: List[Tuple[Hashable, Hashable]],
+                        nodes: List[Hashable],
+                        path: str = 'graph.png') -> None:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    graph = nx.MultiGraph()
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from(edges)
     plt.figure(figsize=(10, 8))  # Set the figure size (width, height) in inches.
     nx.draw(graph, with_labels=True, node_size=500, node_color='skyblue', font_size=10, font_weight='bold')
-    plt.savefig('graph.png')
+    plt.savefig(path)
     plt.close()  # Close the figure to prevent it from being displayed in a window.
 
-def create_friendship_graph(n: int, loop_size: int) -> nx.Graph:
-    G = nx.Graph()
+def create_friendship_graph(n: int, loop_size: int) -> EdgeGraph:
+    G = EdgeGraph()
     central_vertex = 0
     G.add_node(central_vertex)
     
@@ -306,23 +647,23 @@ def create_friendship_graph(n: int, loop_size: int) -> nx.Graph:
 
     return G
 
-def create_balloon_path_graph(n: int) -> nx.Graph:
-    G = nx.Graph()
+def create_balloon_path_graph(n: int) -> EdgeGraph:
+    G = EdgeGraph()
     for i in range(n - 1):
         G.add_node(i)
         G.add_node(i + 1)
         G.add_edge(i, i + 1)
-    for vertex in G.nodes:
+    for vertex in G.nodes():
         G.add_edge(vertex, vertex)
     return G
 
-def create_balloon_cycle_graph(n: int) -> nx.Graph:
+def create_balloon_cycle_graph(n: int) -> EdgeGraph:
     G = create_balloon_path_graph(n)
     G.add_edge(n - 1, 0)
     return G
 
 def create_double_ngon_graph(n):
-    G = nx.Graph()
+    G = EdgeGraph()
 
     # Add vertices and edges for the first n-gon
     for i in range(n):
@@ -338,7 +679,7 @@ def create_double_ngon_graph(n):
 
     return G
 
-def create_loopy_star(n: int, k: int) -> nx.MultiGraph:
+def create_loopy_star(n: int, k: int) -> EdgeGraph:
     """
     Create a loopy star graph with n spokes and k outer loops.
 
@@ -347,9 +688,9 @@ def create_loopy_star(n: int, k: int) -> nx.MultiGraph:
         k (int): Number of outer loops on each spoke.
 
     Returns:
-        networkx.Graph: The loopy star graph.
+        EdgeGraph: The loopy star graph.
     """
-    G = nx.MultiGraph()
+    G = EdgeGraph()
 
     # Add the central vertex
     G.add_node(0)
@@ -362,11 +703,9 @@ def create_loopy_star(n: int, k: int) -> nx.MultiGraph:
         # Add the outer loop vertices and connect them to the spoke vertex
         for j in range(k):
             G.add_edge(i, i)
-    print(G.edges())
     return G
 
 def main():
-    sys.setrecursionlimit(10000)
     parser = argparse.ArgumentParser(description='Solve a game.')
     parser.add_argument(
         '--type',
@@ -384,50 +723,82 @@ def main():
         type=int,
         help='Number of loops for a friendship graph.'
     )
+    parser.add_argument(
+        '--max_memo_entries',
+        type=int,
+        help='Cap on the number of memo entries (defaults to no cap).'
+    )
+    parser.add_argument(
+        '--max_memo_mb',
+        type=float,
+        help='Cap on the memo\'s estimated size in MB (defaults to no cap).'
+    )
+    parser.add_argument(
+        '--canonicalizer',
+        default='refine',
+        choices=list(CANONICALIZERS),
+        help='How positions are keyed in the memo: "refine" (colour refinement with greedy tie-breaks) or "ir" (individualization-refinement, a true canonical form). Defaults to "refine".'
+    )
+    parser.add_argument(
+        '--draw',
+        action='store_true',
+        help='Draw the graph to graph.png in a background process while solving (defaults to not drawing).'
+    )
 
     args = parser.parse_args()
     src_type: str = args.type
+    options = {
+        'canonicalizer': args.canonicalizer,
+        'max_memo_entries': args.max_memo_entries,
+        'max_memo_bytes': None if args.max_memo_mb is None
+            else int(args.max_memo_mb * 1024 * 1024),
+        'draw': args.draw
+    }
 
     if src_type == 'complete':
         if args.nodes is None:
             raise ValueError('Nodes parameter must be provided for "complete" type.')
-        G = nx.complete_graph(args.nodes)
-        _ = run(G)
+        import networkx as nx
+        _ = run(EdgeGraph.from_networkx(nx.complete_graph(args.nodes)), **options)
     elif src_type == 'wheel':
         if args.nodes is None:
             raise ValueError('Nodes parameter must be provided for "wheel" type.')
-        _ = run(nx.wheel_graph(args.nodes+1))
+        import networkx as nx
+        _ = run(EdgeGraph.from_networkx(nx.wheel_graph(args.nodes+1)), **options)
     elif src_type == 'petersen':
-        _ = run(nx.petersen_graph())
+        import networkx as nx
+        _ = run(EdgeGraph.from_networkx(nx.petersen_graph()), **options)
     elif src_type == 'friendship':
         if args.nodes is None or args.loops is None:
             raise ValueError('Nodes & loops parameters must be provided for "friendship" type.')
-        _ = run(create_friendship_graph(args.nodes, args.loops))
+        _ = run(create_friendship_graph(args.nodes, args.loops), **options)
     elif src_type == 'balloon_path':
         if args.nodes is None:
             raise ValueError('Nodes parameter must be provided for "balloon_path" type.')
-        _ = run(create_balloon_path_graph(args.nodes))
+        _ = run(create_balloon_path_graph(args.nodes), **options)
     elif src_type == 'balloon_cycle':
         if args.nodes is None:
             raise ValueError('Nodes parameter must be provided for "balloon_cycle" type.')
-        _ = run(create_balloon_cycle_graph(args.nodes))
+        _ = run(create_balloon_cycle_graph(args.nodes), **options)
     elif src_type == 'double_ngon':
         if args.nodes is None:
             raise ValueError('Nodes parameter must be provided for "double_ngon" type.')
-        _ = run(create_double_ngon_graph(args.nodes))
+        _ = run(create_double_ngon_graph(args.nodes), **options)
     elif src_type == 'hypercube':
         if args.nodes is None:
             raise ValueError('Nodes parameter must be provided for "hypercube" type.')
-        _ = run(nx.hypercube_graph(args.nodes))
+        import networkx as nx
+        _ = run(EdgeGraph.from_networkx(nx.hypercube_graph(args.nodes)), **options)
     elif src_type == 'loopy_star':
         if args.nodes is None or args.loops is None:
             raise ValueError('Nodes & loops parameters must be provided for "loopy_star" type.')
-        _ = run(create_loopy_star(args.nodes, args.loops))
+        _ = run(create_loopy_star(args.nodes, args.loops), **options)
     elif src_type == 'other':
-        G = nx.Graph()
-        G.add_nodes_from([0, 1, 2, 3, 4, 5, 6, 7, 8])
-        G.add_edges_from([(1,4), (1,5), (1,8), (2,4), (2,5), (3,5), (3,6), (4,6), (4,7), (5,8), (6,7), (7,0), (8,0)])
-        _ = run(G)
+        G = EdgeGraph(
+            [(1,4), (1,5), (1,8), (2,4), (2,5), (3,5), (3,6), (4,6), (4,7), (5,8), (6,7), (7,0), (8,0)],
+            [0, 1, 2, 3, 4, 5, 6, 7, 8]
+        )
+        _ = run(G, **options)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,6 +1,23 @@
-from typing import Tuple, List, Dict, Set
+from typing import (
+    Tuple, List, Dict, Iterator, Optional, NamedTuple, Callable
+)
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
 import time
+from transposition import (
+    TranspositionTable, TableEntry, EXACT, LOWER, UPPER, pack_key
+)
+from memo_store import MemoStore
+from shared_table import SharedTranspositionTable
+from journal import Journal, RootResult, read_journal
+from evaluators import Evaluator, DEFAULT_EVALUATORS, evaluate
+from canonical_labeling import CanonicalLabeling
+from tablebase import open_tablebase
+from search_metrics import SearchMetrics, progress_line
 
 class Vertex:
     def __init__(self, raw_id: int, neighbors: List[int]) -> None:
@@ -8,8 +25,9 @@ class Vertex:
         self.neighbors = neighbors
         self.num_neighbors = len(neighbors)
         self._init_num_loops()
+        self.neighbor_vertices: List['Vertex'] = []
         self.canonical_id: int = -1
-        self.category_key: List[int] = None
+        self.category_key: Tuple[int, ...] = None
         self.category: int = -1
         self.prior_category: int = -1
 
@@ -43,6 +61,8 @@ class CanonicalEdges:
                 else:
                     self.vertices[v1].add_neighbor(v0)
         self._num_vertices = len(self.vertices)
+        for v in self.vertices.values():
+            v.neighbor_vertices = [self.vertices[n] for n in v.neighbors]
 
     def calc(self) -> List[Tuple[int, int]]:
         self._categorize_vertices_by_connections()
@@ -62,23 +82,20 @@ class CanonicalEdges:
     def _init_category_iteration_variables(self) -> None:
         self._iterations = 0
         for v in self.vertices.values():
-            v.category_key = [v.num_neighbors, -1 * v.num_loops]
+            v.category_key = (v.num_neighbors, -1 * v.num_loops)
         self._update_categories_based_on_category_keys()
 
     def _update_categories_based_on_category_keys(self) -> None:
-        self._category_keys = list(set(
-            [tuple(v.category_key) for v in self.vertices.values()]
-        ))
-        self._category_keys.sort()
+        self._category_keys = sorted(
+            {v.category_key for v in self.vertices.values()}
+        )
         self._num_categories = len(self._category_keys)
-        vertices_for_category_key: Dict[Tuple[int, ...], List[Vertex]] = {
-            category_key: [] for category_key in self._category_keys
+        category_for_key = {
+            category_key: i
+            for i, category_key in enumerate(self._category_keys)
         }
         for v in self.vertices.values():
-            vertices_for_category_key[tuple(v.category_key)].append(v)
-        for i, category_key in enumerate(self._category_keys):
-            for v in vertices_for_category_key[category_key]:
-                v.category = i
+            v.category = category_for_key[v.category_key]
         self._iterations += 1
 
     def _iteration_is_done(self) -> bool:
@@ -98,15 +115,15 @@ class CanonicalEdges:
             return not a_category_has_changed
 
     def _update_category_iteration_variables(self) -> None:
+        # Counts are filled in highest category first, which is the order
+        # they are compared in.
+        top_category = self._num_categories - 1
         for v in self.vertices.values():
             v.prior_category = v.category
-            v.category_key = [v.category]
-            num_neighbors_for_category = [
-                0 for _ in range(self._num_categories)
-            ]
-            for n in v.neighbors:
-                num_neighbors_for_category[self.vertices[n].category] += 1
-            v.category_key.extend(reversed(num_neighbors_for_category))
+            num_neighbors_for_category = [0] * self._num_categories
+            for n in v.neighbor_vertices:
+                num_neighbors_for_category[top_category - n.category] += 1
+            v.category_key = (v.category, *num_neighbors_for_category)
         self._update_categories_based_on_category_keys()
 
     def _finalize_canonical_ids(self) -> None:
@@ -222,170 +239,1256 @@ def edges_for_wheel(n: int) -> List[Tuple[int, int]]:
     edges.append((n - 1, n))
     return edges
 
-class GameGraph:
-    def __init__(self, edges: List[Tuple[int, int]]):
+def edges_for_hypercube(d: int) -> List[Tuple[int, int]]:
+    edges: List[Tuple[int, int]] = []
+    for v in range(1 << d):
+        for i in range(d):
+            if not v >> i & 1:
+                edges.append((v, v | 1 << i))
+    return edges
+
+def edges_for_balloon_path(n: int) -> List[Tuple[int, int]]:
+    edges: List[Tuple[int, int]] = [(i, i + 1) for i in range(n - 1)]
+    edges.extend((i, i) for i in range(n))
+    return edges
+
+def edges_for_balloon_cycle(n: int) -> List[Tuple[int, int]]:
+    return edges_for_balloon_path(n) + [(0, n - 1)]
+
+def edges_for_loopy_star(n: int, k: int = 1) -> List[Tuple[int, int]]:
+    edges: List[Tuple[int, int]] = []
+    for i in range(1, n + 1):
+        edges.append((0, i))
+        edges.extend((i, i) for _ in range(k))
+    return edges
+
+def edges_for_friendship(n: int, loop_size: int) -> List[Tuple[int, int]]:
+    edges: List[Tuple[int, int]] = []
+    for loop_index in range(n):
+        previous_vertex = 0
+        for vertex_offset in range(loop_size - 1):
+            vertex = loop_index * (loop_size - 1) + vertex_offset + 1
+            edges.append((previous_vertex, vertex))
+            previous_vertex = vertex
+        if loop_size > 2:
+            edges.append((previous_vertex, 0))
+    return edges
+
+def edges_for_type(src_type: str, params: List[int]) -> List[Tuple[int, int]]:
+    if src_type == 'file':
+        return edges_from_input_file()
+    elif src_type == 'm_by_n':
+        return edges_for_m_by_n_grid(params[0], params[1])
+    elif src_type == 'complete':
+        return edges_for_complete_graph(params[0])
+    elif src_type == 'wheel':
+        return edges_for_wheel(params[0])
+    elif src_type == 'hypercube':
+        return edges_for_hypercube(params[0])
+    elif src_type == 'balloon_path':
+        return edges_for_balloon_path(params[0])
+    elif src_type == 'balloon_cycle':
+        return edges_for_balloon_cycle(params[0])
+    elif src_type == 'loopy_star':
+        return edges_for_loopy_star(*params[:2])
+    elif src_type == 'friendship':
+        return edges_for_friendship(params[0], params[1])
+    raise ValueError(f'Unrecognized edge source type: {src_type}')
+
+CANONICALIZERS = ('refine', 'ir')
+
+# Share of a --max_memo_mb budget left to the board's two caches (half
+# each); the memo gets the rest.
+CACHE_BUDGET_FRACTION = 0.25
+
+# Rough costs of the board's cache entries, measured like the memo's.
+_COMPONENT_OVERHEAD_BYTES = 300
+_KEY_OVERHEAD_BYTES = 120
+_CACHED_EDGE_BYTES = 64
+_CACHED_VERTEX_BYTES = 48
+
+ORDERING_STAGES = ('memo', 'captures', 'safety', 'killer', 'history')
+DEFAULT_ORDERING = ('memo', 'captures', 'safety')
+
+def parse_ordering(text: str) -> Tuple[str, ...]:
+    """Move ordering stages for a comma-separated list like 'memo,killer'.
+
+    'none' is the empty ordering, which leaves moves in edge order.
+    """
+    if text == 'none':
+        return ()
+    stages = tuple(text.split(','))
+    for stage in stages:
+        if stage not in ORDERING_STAGES:
+            raise ValueError(f'Unrecognized move ordering stage: {stage}')
+    return stages
+
+class CanonicalComponent:
+    """Canonical form of one connected component of a position.
+
+    'refine' is `CanonicalEdges`, which breaks ties between equally refined
+    vertices greedily, so isomorphic components can end up with different
+    keys. 'ir' is `CanonicalLabeling`, a true canonical form, and its
+    `labeling` is kept for the automorphisms it found.
+    """
+
+    def __init__(self,
+        edges: List[Tuple[int, int]], canonicalizer: str = 'refine'
+    ) -> None:
+        self.labeling: Optional[CanonicalLabeling] = None
+        if canonicalizer == 'ir':
+            self.labeling = CanonicalLabeling(edges)
+            self.edges = self.labeling.calc()
+            self.canonical_ids = self.labeling.canonical_ids
+        else:
+            canonical_edges = CanonicalEdges(edges)
+            self.edges = canonical_edges.calc()
+            self.canonical_ids = {
+                v.raw_id: v.canonical_id
+                for v in canonical_edges.vertices.values()
+            }
+        self.key = pack_key(self.edges)
+        self.num_vertices = len(self.canonical_ids)
+
+class GameBoard:
+    """The root position's edges, shared by every position reached from it.
+
+    A position is a bitmask over `edges`. Bit i of `incidence[v]` is set when
+    edge i touches vertex v, so a vertex is captured once a position's mask
+    no longer intersects its incidence mask. `edges` must be sorted so that
+    repeated edges (e.g. several loops on one vertex) sit next to each other.
+    """
+
+    def __init__(self,
+        edges: List[Tuple[int, int]], canonicalizer: str = 'refine'
+    ) -> None:
+        if canonicalizer not in CANONICALIZERS:
+            raise ValueError(f'Unrecognized canonicalizer: {canonicalizer}')
         self.edges = edges
-        self.vertices = self._vertices()
-        self.num_edges = len(self.edges)
-        self.num_vertices = len(self.vertices)
+        self.canonicalizer = canonicalizer
+        self.num_edges = len(edges)
+        self.full_mask = (1 << self.num_edges) - 1
+        self.incidence: Dict[int, int] = {}
+        for i, (v0, v1) in enumerate(edges):
+            self.incidence[v0] = self.incidence.get(v0, 0) | (1 << i)
+            self.incidence[v1] = self.incidence.get(v1, 0) | (1 << i)
+        self.num_vertices = len(self.incidence)
+        self.cuts: List[Tuple[int, int, int]] = [
+            (1 << i, self.incidence[v0], 0 if v0 == v1 else self.incidence[v1])
+            for i, (v0, v1) in enumerate(edges)
+        ]
+        self.loop_mask = 0
+        for i, (v0, v1) in enumerate(edges):
+            if v0 == v1:
+                self.loop_mask |= 1 << i
+        self.repeated_edges = 0
+        for i in range(1, self.num_edges):
+            if edges[i] == edges[i - 1]:
+                self.repeated_edges |= 1 << i
+        self.adjacent_edges: List[int] = [
+            self.incidence[v0] | self.incidence[v1] for v0, v1 in edges
+        ]
+        # For the forest check a loop counts as an edge to a shared ground
+        # vertex, whose incidence mask is `loop_mask`. Vertices are named by
+        # their incidence masks here; two vertices with the same mask touch
+        # the same edges, so peeling treats them alike anyway.
+        self.grounded_ends: List[Tuple[int, int]] = [
+            (self.incidence[v0], self.loop_mask if v0 == v1 else
+             self.incidence[v1])
+            for v0, v1 in edges
+        ]
+        self.full_core = self.peel_core(
+            self.full_mask,
+            list(self.incidence.values()) + [self.loop_mask]
+        )
+        # Each cache is cleared when it reaches either of its caps (see
+        # `limit_caches`); the byte counts are estimates.
+        self.max_cached_components = 1 << 20
+        self.max_cache_bytes: Optional[int] = None
+        self._component_cache: Dict[int, CanonicalComponent] = {}
+        self._component_cache_bytes = 0
+        # A position's mask already names its labelled edge multiset
+        # exactly (repeats are cut lowest index first), so a position
+        # reached again by another move order finds its key here.
+        self.max_cached_keys = 1 << 20
+        self.key_cache: Dict[int, Tuple[bytes, Dict[int, int]]] = {}
+        self._key_cache_bytes = 0
+        # Every component with a given key has the same canonical edges, so
+        # the orbits of those edges are worked out once per key.
+        self._edge_orbits: Dict[
+            bytes, Dict[Tuple[int, int], Tuple[int, int]]
+        ] = {}
+        self.metrics: Optional[SearchMetrics] = None
+
+    def peel_core(self, core: int, ends: List[int]) -> int:
+        """Strip pendant edges from `core`, starting at the given ends.
+
+        The result is the 2-core of the grounded graph: empty exactly when
+        every component is a tree with at most one loop. Each edge is
+        peeled at most once, so the cost is proportional to the number of
+        edges removed.
+        """
+        while ends:
+            end = ends.pop()
+            remaining = core & end
+            if remaining and not remaining & (remaining - 1):
+                core ^= remaining
+                end0, end1 = self.grounded_ends[remaining.bit_length() - 1]
+                ends.append(end1 if end0 == end else end0)
+        return core
+
+    def limit_caches(self,
+        max_entries: Optional[int], max_bytes: Optional[int]
+    ) -> None:
+        """Cap each of the component and key caches at `max_entries`
+        entries and an estimated `max_bytes`."""
+        if max_entries is not None:
+            self.max_cached_components = min(
+                self.max_cached_components, max_entries
+            )
+            self.max_cached_keys = min(self.max_cached_keys, max_entries)
+        self.max_cache_bytes = max_bytes
+
+    def cache_key(self,
+        mask: int, key: bytes, canonical_ids: Dict[int, int]
+    ) -> None:
+        if (
+            len(self.key_cache) >= self.max_cached_keys
+            or self.max_cache_bytes is not None
+            and self._key_cache_bytes >= self.max_cache_bytes
+        ):
+            self.key_cache.clear()
+            self._key_cache_bytes = 0
+        self.key_cache[mask] = (key, canonical_ids)
+        self._key_cache_bytes += (
+            _KEY_OVERHEAD_BYTES + sys.getsizeof(key)
+            + _CACHED_VERTEX_BYTES * len(canonical_ids)
+        )
+
+    def edge_orbits(self,
+        mask: int, component: CanonicalComponent
+    ) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """The least edge of each canonical edge's orbit, for the component
+        at `mask`, under the automorphisms `CanonicalLabeling` finds.
+
+        Under 'ir' those come with the component's key; under 'refine' the
+        component is labelled once per key. Either way the automorphisms
+        are carried over to canonical ids, where they hold for every
+        component with the same key.
+        """
+        orbits = self._edge_orbits.get(component.key)
+        if orbits is not None:
+            return orbits
+        labeling = component.labeling
+        if labeling is None:
+            labeling = CanonicalLabeling([
+                self.edges[i] for i in range(self.num_edges) if mask >> i & 1
+            ])
+            labeling.calc()
+        ids = component.canonical_ids
+        orbits = {}
+
+        def find(e: Tuple[int, int]) -> Tuple[int, int]:
+            while orbits[e] != e:
+                orbits[e] = orbits[orbits[e]]
+                e = orbits[e]
+            return e
+
+        raw_ids = {canonical_id: raw_id for raw_id, canonical_id in ids.items()}
+        for e in component.edges:
+            orbits[(min(e), max(e))] = (min(e), max(e))
+        for g in labeling.automorphisms:
+            for v0, v1 in list(orbits):
+                w0, w1 = ids[g[raw_ids[v0]]], ids[g[raw_ids[v1]]]
+                root = find((v0, v1))
+                image_root = find((min(w0, w1), max(w0, w1)))
+                if root != image_root:
+                    orbits[max(root, image_root)] = min(root, image_root)
+        for e in orbits:
+            orbits[e] = find(e)
+        if len(self._edge_orbits) >= self.max_cached_components:
+            self._edge_orbits.clear()
+        self._edge_orbits[component.key] = orbits
+        return orbits
+
+    def canonical_component(self, mask: int) -> CanonicalComponent:
+        if mask not in self._component_cache:
+            if (
+                len(self._component_cache) >= self.max_cached_components
+                or self.max_cache_bytes is not None
+                and self._component_cache_bytes >= self.max_cache_bytes
+            ):
+                self._component_cache.clear()
+                self._component_cache_bytes = 0
+            edges = [
+                self.edges[i] for i in range(self.num_edges) if mask >> i & 1
+            ]
+            if self.metrics is None:
+                self._component_cache[mask] = CanonicalComponent(
+                    edges, self.canonicalizer
+                )
+            else:
+                start_time = time.perf_counter()
+                self._component_cache[mask] = CanonicalComponent(
+                    edges, self.canonicalizer
+                )
+                self.metrics.canonicalize_seconds += (
+                    time.perf_counter() - start_time
+                )
+                self.metrics.num_canonicalized += 1
+            component = self._component_cache[mask]
+            self._component_cache_bytes += (
+                _COMPONENT_OVERHEAD_BYTES + sys.getsizeof(component.key)
+                + _CACHED_EDGE_BYTES * len(component.edges)
+                + _CACHED_VERTEX_BYTES * component.num_vertices
+            )
+        return self._component_cache[mask]
+
+class GameGraph:
+    def __init__(self,
+        board: GameBoard, mask: int, num_edges: int, num_vertices: int,
+        core: int
+    ):
+        self.board = board
+        self.mask = mask
+        self.num_edges = num_edges
+        self.num_vertices = num_vertices
+        self.core = core
         self._have_set_key = False
-        self._have_determined_if_is_tree = False
 
-    def _vertices(self) -> List[int]:
-        vertices: Set[int] = set()
-        for edge in self.edges:
-            vertices.add(edge[0])
-            vertices.add(edge[1])
-        return list(vertices)
+    @property
+    def edges(self) -> List[Tuple[int, int]]:
+        return [self.board.edges[i] for i in self.edge_indices()]
+
+    @property
+    def vertices(self) -> List[int]:
+        return [
+            v for v, incidence in self.board.incidence.items()
+            if self.mask & incidence
+        ]
+
+    def edge_indices(self) -> Iterator[int]:
+        remaining = self.mask
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            yield bit.bit_length() - 1
+
+    def moves(self) -> Iterator[int]:
+        """Indices of the edges worth cutting, one per group of repeats."""
+        remaining = self.mask
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if bit & self.board.repeated_edges and self.mask & (bit >> 1):
+                continue
+            yield bit.bit_length() - 1
+
+    def orbit_moves(self, preferred: Optional[int] = None) -> List[int]:
+        """One move per orbit of the position's edges under automorphism.
 
-    def contains_vertex(self, vertex: int) -> bool:
-        return vertex in self.vertices
+        Orbits are taken within each component (see `GameBoard.edge_orbits`),
+        and components with the same key share theirs, since swapping two
+        isomorphic components is an automorphism too. Each orbit is
+        represented by its lowest edge index, or by `preferred` if it is in
+        the orbit.
+        """
+        members: Dict[Tuple[bytes, Tuple[int, int]], List[int]] = {}
+        for mask in self.components():
+            component = self.board.canonical_component(mask)
+            orbits = self.board.edge_orbits(mask, component)
+            ids = component.canonical_ids
+            for index in self.edge_indices():
+                if not mask >> index & 1:
+                    continue
+                v0, v1 = self.board.edges[index]
+                c0, c1 = ids[v0], ids[v1]
+                orbit = orbits[(min(c0, c1), max(c0, c1))]
+                members.setdefault((component.key, orbit), []).append(index)
+        moves: List[int] = []
+        for orbit_members in members.values():
+            moves.append(
+                preferred if preferred in orbit_members
+                else min(orbit_members)
+            )
+        return sorted(moves)
+
+    def cut_edge(self, index: int) -> Tuple['GameGraph', int]:
+        bit, incidence0, incidence1 = self.board.cuts[index]
+        mask = self.mask ^ bit
+        points = 0
+        if not mask & incidence0:
+            points += 1
+        if incidence1 and not mask & incidence1:
+            points += 1
+        core = self.core
+        if core & bit:
+            core = self.board.peel_core(
+                core ^ bit, list(self.board.grounded_ends[index])
+            )
+        new_graph = GameGraph(
+            self.board, mask, self.num_edges - 1, self.num_vertices - points,
+            core
+        )
+        return (new_graph, points)
+
+    def components(self) -> List[int]:
+        """Edge masks of the position's connected components."""
+        components: List[int] = []
+        remaining = self.mask
+        while remaining:
+            component = remaining & -remaining
+            frontier = component
+            while frontier:
+                reached = 0
+                while frontier:
+                    bit = frontier & -frontier
+                    frontier ^= bit
+                    reached |= self.board.adjacent_edges[bit.bit_length() - 1]
+                frontier = reached & remaining & ~component
+                component |= frontier
+            components.append(component)
+            remaining &= ~component
+        return components
 
     @property
-    def key(self) -> str:
+    def key(self) -> bytes:
+        # Each component is canonicalized on its own, and the components are
+        # laid out in order of their keys, so the key of a disconnected
+        # position doesn't depend on how ties between components are broken.
         if not self._have_set_key:
-            self._key = self._key_for_edges(CanonicalEdges(self.edges).calc())
+            cached = self.board.key_cache.get(self.mask)
+            if cached is not None:
+                self._key, self._canonical_ids = cached
+                self._have_set_key = True
+                return self._key
+            components = sorted(
+                (self.board.canonical_component(c) for c in self.components()),
+                key=lambda c: c.key
+            )
+            canonical_edges: List[Tuple[int, int]] = []
+            self._canonical_ids: Dict[int, int] = {}
+            offset = 0
+            for c in components:
+                canonical_edges.extend(
+                    (e[0] + offset, e[1] + offset) for e in c.edges
+                )
+                for raw_id, canonical_id in c.canonical_ids.items():
+                    self._canonical_ids[raw_id] = canonical_id + offset
+                offset += c.num_vertices
+            self._key = pack_key(canonical_edges)
             self._have_set_key = True
+            self.board.cache_key(self.mask, self._key, self._canonical_ids)
         return self._key
 
-    def _key_for_edges(self, edges: List[Tuple[int, int]]) -> str:
-        edge_strs = [f'{e[0]}-{e[1]}' for e in edges]
-        return '|'.join(edge_strs)
+    def canonical_move(self, index: int) -> Tuple[int, int]:
+        _ = self.key
+        v0, v1 = self.board.edges[index]
+        return tuple(sorted(
+            (self._canonical_ids[v0], self._canonical_ids[v1])
+        ))
+
+    def raw_move(self, move: Tuple[int, int]) -> Optional[int]:
+        for index in self.edge_indices():
+            if self.canonical_move(index) == move:
+                return index
+        return None
 
     @property
     def is_tree(self) -> bool:
-        if not self._have_determined_if_is_tree:
-            if self.num_edges > self.num_vertices:
-                self._is_tree = False
-            elif self.num_edges == 1:
-                self._is_tree = True
-            else:
-                self._iteratively_pare_tree()
-                self._is_tree = len(self._tree_edges) == 0
-            self._have_determined_if_is_tree = True
-        return self._is_tree
-
-    def _iteratively_pare_tree(self) -> None:
-        self._initialize_tree_attributes()
-        while len(self._tree_ends) > 0:
-            self._remove_ends_from_tree()
-
-    def _initialize_tree_attributes(self) -> None:
-        self._tree_edges = self.edges.copy()
-        self._num_edges_for_tree_vertex = {v: 0 for v in self.vertices}
-        for e in self._tree_edges:
-            self._num_edges_for_tree_vertex[e[0]] += 1
-            if e[1] != e[0]:
-                self._num_edges_for_tree_vertex[e[1]] += 1
-        self._update_tree_ends()
-
-    def _update_tree_ends(self) -> None:
-        self._tree_ends = [
-            v for v, num in self._num_edges_for_tree_vertex.items() if num == 1
-        ]
+        # Cutting an edge outside the 2-core leaves the core as it was, so
+        # the core is only re-peeled when a cut lands inside it.
+        return self.core == 0
+
 
-    def _remove_ends_from_tree(self) -> None:
-        for e in self._tree_edges.copy():
-            if (e[0] in self._tree_ends) or (e[1] in self._tree_ends):
-                self._decrement_num_edges_for_tree_vertex(e[0])
-                if e[1] != e[0]:
-                    self._decrement_num_edges_for_tree_vertex(e[1])
-                self._tree_edges.remove(e)
-        self._update_tree_ends()
+class SearchTimeout(Exception):
+    pass
 
-    def _decrement_num_edges_for_tree_vertex(self, vertex: int) -> None:
-        self._num_edges_for_tree_vertex[vertex] -= 1
-        if self._num_edges_for_tree_vertex[vertex] == 0:
-            del self._num_edges_for_tree_vertex[vertex]
+class BoundedScore(NamedTuple):
+    lower: int
+    upper: int
+    best_move: Optional[Tuple[int, int]]
 
+def budgeted_memo(
+    max_entries: Optional[int], max_bytes: Optional[int]
+) -> TranspositionTable:
+    """A memo for a memory budget of `max_bytes`, keeping back
+    `CACHE_BUDGET_FRACTION` of it for the caches of the boards that search
+    against it (see `cache_limits`)."""
+    if max_bytes is not None:
+        max_bytes = int(max_bytes * (1 - CACHE_BUDGET_FRACTION))
+    return TranspositionTable(max_entries, max_bytes)
+
+def cache_limits(
+    memo: TranspositionTable
+) -> Tuple[Optional[int], Optional[int]]:
+    """Entry and byte caps for each of a board's caches, from its memo's.
+
+    Each cache holds at most as many entries as the memo, and gets half of
+    the bytes `budgeted_memo` kept back.
+    """
+    max_bytes = None
+    if memo.max_bytes is not None:
+        max_bytes = int(
+            memo.max_bytes * CACHE_BUDGET_FRACTION / 2
+            / (1 - CACHE_BUDGET_FRACTION)
+        )
+    return (memo.max_entries, max_bytes)
 
 class GameRunner:
-    def __init__(self, edges: List[Tuple[int, int]]):
+    def __init__(self,
+        edges: List[Tuple[int, int]],
+        evaluators: List[Evaluator] = DEFAULT_EVALUATORS,
+        canonicalizer: str = 'refine', max_memo_entries: Optional[int] = None,
+        max_memo_bytes: Optional[int] = None,
+        memo: Optional[TranspositionTable] = None, show_progress: bool = True,
+        ordering: Tuple[str, ...] = DEFAULT_ORDERING, orbit_depth: int = 1,
+        use_tablebase: bool = True, metrics: Optional[SearchMetrics] = None,
+        on_node: Optional[Callable[['GameGraph', int], None]] = None,
+        on_memo_hit: Optional[Callable[['GameGraph', int, int], None]] = None
+    ):
         self.edges = sorted(edges)
-        self._initial_graph = GameGraph(self.edges)
-        self._memo_file = 'net_scores.txt'
+        self._evaluators = evaluators
+        self._board = GameBoard(self.edges, canonicalizer)
+        self._initial_graph = GameGraph(
+            self._board,
+            self._board.full_mask,
+            self._board.num_edges,
+            self._board.num_vertices,
+            self._board.full_core
+        )
+        self._memo_file = 'net_scores.db'
+        self._legacy_memo_file = 'net_scores.txt'
+        self._tablebase_file = 'tablebase.bin'
+        self._tablebase = None
+        if use_tablebase:
+            self._tablebase = open_tablebase(self._tablebase_file)
+        self._memo = memo
+        if memo is None:
+            self._memo = budgeted_memo(max_memo_entries, max_memo_bytes)
+        self._board.limit_caches(*cache_limits(self._memo))
+        self._show_progress = show_progress
+        # Metrics and hooks are only looked at when set, so a search without
+        # them pays a test for None at each point they would be called.
+        self._metrics = metrics
+        self._board.metrics = metrics
+        self.on_node = on_node
+        self.on_memo_hit = on_memo_hit
+        self.ordering = ordering
+        self.orbit_depth = orbit_depth
+        self.num_nodes = 0
+        self._deadline: Optional[float] = None
+        # Two killer moves per depth and a history score per edge, both as
+        # indices into the board's edges.
+        self._killers: List[List[int]] = [
+            [] for _ in range(self._board.num_edges + 1)
+        ]
+        self._history: List[int] = [0] * self._board.num_edges
+        self._journal_file = 'net_scores.journal'
+        self._journal: Optional[Journal] = None
+        self._root_results: Dict[Tuple[int, int], RootResult] = {}
+        self.progress_interval = 1.0
         self._progress = {
             'top_level': self._initial_graph.num_edges,
             'count': 0,
-            'start_time': time.perf_counter()
+            'start_time': time.perf_counter(),
+            'next_time': time.perf_counter() + self.progress_interval
         }
 
-    def run(self, write_file: bool = False) -> int:
-        self._init_memo()
-        net_score = self._net_score(self._initial_graph, depth=0)
-        if net_score == 0:
-            print('Tie game.')
+    def run(self,
+        write_file: bool = False, resume: bool = False,
+        time_budget: Optional[float] = None
+    ) -> int:
+        self._init_memo(write_file)
+        if write_file or resume:
+            self._init_journal(resume)
+        if time_budget is None:
+            print_net_score(self.solve())
         else:
-            winner = 'P1' if net_score > 0 else 'P2'
-            print(f'{winner} wins with a net score of {net_score} (P1-P2).')
+            print_bounded_score(self.solve_within(time_budget))
+        print(self._memo.hit_summary())
+        print(f'nodes:{self.num_nodes}')
         if write_file:
             self._write_memo()
+        if self._journal is not None:
+            self._journal.close()
+            if write_file:
+                # Everything the journal held is in the store now.
+                os.remove(self._journal_file)
+        self._store.close()
 
-    def _init_memo(self) -> None:
-        self._memo: Dict[str, int] = {}
-        with open(self._memo_file, 'r') as file:
-            lines = file.readlines()
-        for line in lines:
-            items = line.split(',')
-            self._memo[items[0]] = int(items[1])
+    def solve(self) -> int:
+        return self._net_score(
+            self._initial_graph,
+            depth=0,
+            alpha=-1 * self._initial_graph.num_vertices,
+            beta=self._initial_graph.num_vertices
+        )
+
+    def solve_within(self, time_budget: float) -> BoundedScore:
+        """Bounds on the net score proven within `time_budget` seconds.
+
+        Each iteration tests whether the score reaches a value between the
+        bounds with a null-window search, which raises the lower bound or
+        lowers the upper one, and the memo carries over to the next. A
+        search cut short by the deadline proves nothing, but the entries it
+        stored still stand. The best move is the root's best move from the
+        last finished search, as a root edge.
+        """
+        graph = self._initial_graph
+        # Every vertex is captured by someone, so the net score has the
+        # parity of the number of vertices.
+        lower = -1 * graph.num_vertices
+        upper = graph.num_vertices
+        best_move = None
+        self._deadline = time.perf_counter() + time_budget
+        try:
+            while lower < upper:
+                gamma = lower + 2 * ((upper - lower) // 4 + 1)
+                value = self._net_score(graph, 0, gamma - 1, gamma)
+                if value >= gamma:
+                    lower = value + (value - graph.num_vertices) % 2
+                else:
+                    upper = value - (value - graph.num_vertices) % 2
+                entry = self._memo.get(graph.key)
+                if entry is not None and entry.best_move is not None:
+                    index = graph.raw_move(entry.best_move)
+                    if index is not None:
+                        best_move = self._board.edges[index]
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+        return BoundedScore(lower, upper, best_move)
+
+    def _init_memo(self, write_file: bool = False) -> None:
+        # The store is only opened here; entries are read as the search
+        # reaches their positions, and new ones are written in batches.
+        if isinstance(self._memo, SharedTranspositionTable):
+            raise ValueError(
+                'A shared transposition table keeps only digests of its ' +
+                'keys, so it can\'t be backed by the memo store.'
+            )
+        self._store = MemoStore(self._memo_file)
+        if (
+            self._store.is_empty()
+            and os.path.exists(self._legacy_memo_file)
+        ):
+            self._store.put_many(self._read_legacy_memo())
+        self._memo.attach_store(self._store, write_back=write_file)
+
+    def _init_journal(self, resume: bool) -> None:
+        # Resuming replays the journal into the memo and picks up the root
+        # moves it finished; otherwise the journal starts over.
+        if resume:
+            entries, self._root_results = read_journal(
+                self._journal_file, self._initial_graph.key
+            )
+            for key, entry in entries:
+                self._memo.put(key, entry)
+            print(
+                f'resumed {len(entries)} memo entries and ' +
+                f'{len(self._root_results)} root moves'
+            )
+        else:
+            open(self._journal_file, 'w').close()
+        self._journal = Journal(self._journal_file)
+
+    def _read_legacy_memo(self) -> Iterator[Tuple[bytes, TableEntry]]:
+        with open(self._legacy_memo_file, 'r') as file:
+            for line in file:
+                items = line.rstrip('\n').split(',')
+                edges = self._edges_for_memo_key(items[0])
+                if len(items) == 2:
+                    # Older memo files hold exact scores only.
+                    num_edges = len(edges)
+                    entry = TableEntry(int(items[1]), EXACT, num_edges, None)
+                else:
+                    best_move = None
+                    if items[4]:
+                        v0, v1 = items[4].split('-')
+                        best_move = (int(v0), int(v1))
+                    entry = TableEntry(
+                        int(items[1]), items[2], int(items[3]), best_move
+                    )
+                yield (pack_key(edges), entry)
+
+    def _edges_for_memo_key(self, key: str) -> List[Tuple[int, int]]:
+        edges: List[Tuple[int, int]] = []
+        for edge in key.split('|') if key else []:
+            v0, v1 = edge.split('-')
+            edges.append((int(v0), int(v1)))
+        return edges
 
     def _write_memo(self) -> None:
-        with open(self._memo_file, 'w') as file:
-            for key, value in self._memo.items():
-                file.write(f'{key},{value}\n')
+        self._memo.flush()
 
-    def _net_score(self, graph: GameGraph, depth: int) -> int:
-        if graph.key in self._memo:
-            return self._memo[graph.key]
-        if graph.is_tree:
-            self._memo[graph.key] = graph.num_vertices
-            return graph.num_vertices
+    def _net_score(self,
+        graph: GameGraph, depth: int, alpha: int, beta: int
+    ) -> int:
+        """Net score for the player to move, searched within (alpha, beta).
+
+        A capture keeps the turn, so its child is searched with the window
+        shifted by the points taken; any other move hands the turn over and
+        negates the window. A score outside the window is stored in the memo
+        as a lower or upper bound rather than an exact score.
+        """
+        self.num_nodes += 1
+        if not self.num_nodes & 1023:
+            self._check_in()
+        if self.on_node is not None:
+            self.on_node(graph, depth)
+        if self._metrics is not None:
+            self._metrics.count_node(depth)
+        value = self._settled_value(graph)
+        if value is not None:
+            return value
+        alpha = max(alpha, -1 * graph.num_vertices)
+        beta = min(beta, graph.num_vertices)
+        probe = self._memo.probe(graph.key, graph.num_edges, alpha, beta)
+        if probe.value is not None:
+            if self.on_memo_hit is not None:
+                self.on_memo_hit(graph, depth, probe.value)
+            return probe.value
+        value = self._tablebase_value(graph)
+        if value is not None:
+            return value
+        alpha, beta = probe.alpha, probe.beta
+        window = (alpha, beta)
         new_depth = depth + 1
         best_outcome = -1 * graph.num_vertices
-        tried_edges = []
-        for e in graph.edges:
-            if e in tried_edges:
-                continue
-            tried_edges.append(e)
-            new_graph, points = self._cut_edge(graph, e)
-            mult = 1 if points > 0 else -1
-            outcome = points + mult * self._net_score(new_graph, new_depth)
-            if outcome > best_outcome:
+        best_index = None
+        if self._metrics is None:
+            moves = self._ordered_moves(graph, depth, probe.best_move)
+        else:
+            start_time = time.perf_counter()
+            moves = self._ordered_moves(graph, depth, probe.best_move)
+            self._metrics.move_seconds += time.perf_counter() - start_time
+        for index in moves:
+            outcome = None
+            if depth == 0:
+                outcome = self._resumed_outcome(
+                    graph.canonical_move(index), alpha, beta
+                )
+            if outcome is None:
+                new_graph, points = graph.cut_edge(index)
+                if points > 0:
+                    outcome = points + self._net_score(
+                        new_graph, new_depth, alpha - points, beta - points
+                    )
+                else:
+                    outcome = -1 * self._net_score(
+                        new_graph, new_depth, -1 * beta, -1 * alpha
+                    )
+                if depth == 0 and self._journal is not None:
+                    self._journal.record_root_move(
+                        graph.key, graph.canonical_move(index), outcome,
+                        alpha, beta
+                    )
+            if best_index is None or outcome > best_outcome:
                 best_outcome = outcome
-                if outcome == graph.num_vertices:
-                    break
+                best_index = index
+                if outcome > alpha:
+                    alpha = outcome
+                    if alpha >= beta:
+                        self._record_cutoff(graph, depth, index)
+                        break
         self._track_progress(depth)
-        self._memo[graph.key] = best_outcome
+        self._memo.store(
+            graph.key, best_outcome, graph.num_edges, *window,
+            graph.canonical_move(best_index)
+        )
+        if self._journal is not None:
+            entry = self._memo.get(graph.key)
+            if entry is not None:
+                self._journal.record_entry(graph.key, entry)
         return best_outcome
 
-    def _cut_edge(self,
-        graph: GameGraph, edge: Tuple[int, int]
-    ) -> Tuple[GameGraph, int]:
-        new_edges = graph.edges.copy()
-        new_edges.remove(edge)
-        new_graph = GameGraph(new_edges)
-        points = 0
-        if not new_graph.contains_vertex(edge[0]):
-            points += 1
-        if edge[1] != edge[0]:
-            if not new_graph.contains_vertex(edge[1]):
-                points += 1
-        return (new_graph, points)
+    def _settled_value(self, graph: GameGraph) -> Optional[int]:
+        # Trees and positions an evaluator recognises need no search.
+        if graph.is_tree:
+            return graph.num_vertices
+        return evaluate(
+            self._evaluators,
+            graph.num_edges,
+            graph.num_vertices,
+            (graph.mask & self._board.loop_mask).bit_count(),
+            lambda: graph.edges
+        )
+
+    def _tablebase_value(self, graph: GameGraph) -> Optional[int]:
+        # Looked up once the memo has missed, and stored there as exact,
+        # since with the 'refine' canonicalizer the lookup labels the
+        # position again the way the tablebase is keyed.
+        if self._tablebase is None or not self._tablebase.covers(
+            graph.num_vertices, graph.num_edges
+        ):
+            return None
+        if self._board.canonicalizer == 'ir':
+            value = self._tablebase.get_key(graph.key)
+        else:
+            value = self._tablebase.get(graph.edges)
+        if value is not None:
+            self._memo.store(
+                graph.key, value, graph.num_edges,
+                -1 * graph.num_vertices - 1, graph.num_vertices + 1, None
+            )
+        return value
+
+    def _resumed_outcome(self,
+        move: Tuple[int, int], alpha: int, beta: int
+    ) -> Optional[int]:
+        # A root move result from the journal stands in for a search when
+        # it would have settled the move in the current window too.
+        result = self._root_results.get(move)
+        if result is None:
+            return None
+        if (
+            result.bound == EXACT
+            or result.bound == LOWER and result.outcome >= beta
+            or result.bound == UPPER and result.outcome <= alpha
+        ):
+            return result.outcome
+        return None
+
+    def _ordered_moves(self,
+        graph: GameGraph, depth: int, best_move: Optional[Tuple[int, int]]
+    ) -> Iterator[int]:
+        """The position's moves, sorted by the stages of `ordering` in turn.
+
+        'memo' puts the memo's best move first, 'captures' puts moves that
+        capture more vertices earlier, and 'safety' puts moves that leave
+        fewer vertices one cut from capture earlier. 'killer' and 'history'
+        put moves that caused cutoffs earlier: the last two at this depth,
+        and any, weighted by the size of the position cut off. Ties keep
+        edge order.
+
+        Above `orbit_depth`, only one move per orbit of the position's
+        edges under automorphism is returned, since the others lead to
+        isomorphic positions.
+        """
+        best_index = None
+        if best_move is not None and 'memo' in self.ordering:
+            best_index = graph.raw_move(best_move)
+        if depth < self.orbit_depth:
+            moves = graph.orbit_moves(best_index)
+        else:
+            moves = graph.moves()
+        if not self.ordering:
+            return iter(moves)
+        board = self._board
+        killers = self._killers[depth]
+
+        def sort_key(index: int) -> Tuple[int, ...]:
+            bit, incidence0, incidence1 = board.cuts[index]
+            mask = graph.mask ^ bit
+            key: List[int] = []
+            for stage in self.ordering:
+                if stage == 'memo':
+                    key.append(0 if index == best_index else 1)
+                elif stage == 'captures':
+                    points = int(not mask & incidence0)
+                    if incidence1:
+                        points += not mask & incidence1
+                    key.append(-1 * points)
+                elif stage == 'safety':
+                    # Only the cut edge's ends change, so count how many
+                    # more of them are left with a single edge.
+                    exposed = 0
+                    for incidence in (incidence0, incidence1):
+                        if incidence:
+                            exposed += (mask & incidence).bit_count() == 1
+                            exposed -= (
+                                graph.mask & incidence
+                            ).bit_count() == 1
+                    key.append(exposed)
+                elif stage == 'killer':
+                    key.append(
+                        killers.index(index) if index in killers else 2
+                    )
+                else:
+                    key.append(-1 * self._history[index])
+            return tuple(key)
+
+        return iter(sorted(moves, key=sort_key))
+
+    def _record_cutoff(self,
+        graph: GameGraph, depth: int, index: int
+    ) -> None:
+        killers = self._killers[depth]
+        if index not in killers:
+            killers.insert(0, index)
+            del killers[2:]
+        self._history[index] += graph.num_edges * graph.num_edges
 
     def _track_progress(self, depth: int) -> None:
+        # Only counted here; `_check_in` prints it now and then.
+        if not self._show_progress:
+            return
         if depth <= self._progress['top_level']:
             if depth == self._progress['top_level']:
                 self._progress['count'] += 1
             else:
                 self._progress['top_level'] = depth
                 self._progress['count'] = 1
-            elapsed_secs = time.perf_counter() - self._progress["start_time"]
+
+    def _check_in(self) -> None:
+        # Called every 1024 nodes, so the clock is read that often and no
+        # more: for the deadline, a metrics sample and a progress line.
+        now = time.perf_counter()
+        if self._deadline is not None and now > self._deadline:
+            raise SearchTimeout()
+        sample = None
+        if (
+            self._metrics is not None
+            and now >= self._metrics.next_sample_time
+        ):
+            sample = self._metrics.sample(self.num_nodes, self._memo)
+        if self._show_progress and now >= self._progress['next_time']:
+            self._progress['next_time'] = now + self.progress_interval
+            if sample is None:
+                elapsed_secs = now - self._progress['start_time']
+                line = (
+                    f'seconds:{elapsed_secs:.2f} nodes:{self.num_nodes}'
+                )
+            else:
+                line = progress_line(sample)
             print(
-                f'top solved depth:{depth} ' +
-                f'count:{self._progress["count"]} '+
-                f'seconds:{elapsed_secs:.2f}'
+                f'top solved depth:{self._progress["top_level"]} ' +
+                f'count:{self._progress["count"]} ' + line
             )
 
+    def write_metrics(self, path: str) -> None:
+        """Write the search's `SearchMetrics` to `path` as JSON."""
+        self._metrics.write(path, self.num_nodes, self._memo)
+
+def print_net_score(net_score: int) -> None:
+    if net_score == 0:
+        print('Tie game.')
+    else:
+        winner = 'P1' if net_score > 0 else 'P2'
+        print(f'{winner} wins with a net score of {net_score} (P1-P2).')
+
+def print_bounded_score(score: BoundedScore) -> None:
+    if score.lower == score.upper:
+        print_net_score(score.lower)
+    else:
+        print(
+            f'Out of time: the net score (P1-P2) is between {score.lower} ' +
+            f'and {score.upper}.'
+        )
+    if score.best_move is not None:
+        v0, v1 = score.best_move
+        print(f'Best first move found: {v0}-{v1}')
+
+_worker_runner: Optional[GameRunner] = None
+
+def _init_parallel_worker(
+    edges: List[Tuple[int, int]], canonicalizer: str, table_name: str,
+    num_slots: int, ordering: Tuple[str, ...], orbit_depth: int
+) -> None:
+    global _worker_runner
+    _worker_runner = GameRunner(
+        edges,
+        canonicalizer=canonicalizer,
+        memo=SharedTranspositionTable(num_slots, table_name),
+        show_progress=False,
+        ordering=ordering,
+        orbit_depth=orbit_depth
+    )
+
+def _solve_parallel_task(
+    task: Tuple[int, int, int, int, int, int, int]
+) -> Tuple[int, int, int, int]:
+    mask, num_edges, num_vertices, core, depth, alpha, beta = task
+    memo = _worker_runner._memo
+    num_probes, num_hits = memo.num_probes, memo.num_hits
+    num_nodes = _worker_runner.num_nodes
+    value = _worker_runner._net_score(
+        GameGraph(_worker_runner._board, mask, num_edges, num_vertices, core),
+        depth, alpha, beta
+    )
+    return (
+        value, memo.num_probes - num_probes, memo.num_hits - num_hits,
+        _worker_runner.num_nodes - num_nodes
+    )
+
+class ParallelSearch:
+    """Splits the top plies of a search over a pool of processes.
+
+    Above `split_depth`, each position's first move is searched here, to
+    set the window (young brothers wait); its remaining moves, one per
+    distinct child position, then go to the pool together and are handed
+    out as workers free up. Below `split_depth`, or inside a worker, the
+    search is the usual sequential one. Everyone shares the runner's
+    table, which must be a `SharedTranspositionTable`.
+    """
+
+    def __init__(self,
+        runner: GameRunner, pool: multiprocessing.pool.Pool,
+        split_depth: int = 6
+    ) -> None:
+        self.runner = runner
+        self.pool = pool
+        self.split_depth = split_depth
+
+    def solve(self) -> int:
+        graph = self.runner._initial_graph
+        return self._search(
+            graph, 0, -1 * graph.num_vertices, graph.num_vertices
+        )
+
+    def _search(self,
+        graph: GameGraph, depth: int, alpha: int, beta: int
+    ) -> int:
+        runner = self.runner
+        if depth >= self.split_depth:
+            return runner._net_score(graph, depth, alpha, beta)
+        runner.num_nodes += 1
+        value = runner._settled_value(graph)
+        if value is not None:
+            return value
+        alpha = max(alpha, -1 * graph.num_vertices)
+        beta = min(beta, graph.num_vertices)
+        probe = runner._memo.probe(graph.key, graph.num_edges, alpha, beta)
+        if probe.value is not None:
+            return probe.value
+        value = runner._tablebase_value(graph)
+        if value is not None:
+            return value
+        alpha, beta = probe.alpha, probe.beta
+        window = (alpha, beta)
+        moves = runner._ordered_moves(graph, depth, probe.best_move)
+        best_index = next(moves)
+        child, points = graph.cut_edge(best_index)
+        if points > 0:
+            best_outcome = points + self._search(
+                child, depth + 1, alpha - points, beta - points
+            )
+        else:
+            best_outcome = -1 * self._search(
+                child, depth + 1, -1 * beta, -1 * alpha
+            )
+        alpha = max(alpha, best_outcome)
+        if alpha < beta:
+            # Moves to the same position (up to isomorphism) score the same,
+            # so only one of each is searched.
+            indices: List[int] = []
+            tasks: List[Tuple[int, int, int, int, int, int, int]] = []
+            seen = {child.key}
+            for index in moves:
+                child, points = graph.cut_edge(index)
+                if child.key in seen:
+                    continue
+                seen.add(child.key)
+                if points > 0:
+                    child_window = (alpha - points, beta - points)
+                else:
+                    child_window = (-1 * beta, -1 * alpha)
+                indices.append(index)
+                tasks.append((
+                    child.mask, child.num_edges, child.num_vertices,
+                    child.core, depth + 1, *child_window
+                ))
+            for index, task, value in zip(
+                indices, tasks, self._solve_batch(tasks)
+            ):
+                points = graph.num_vertices - task[2]
+                outcome = points + value if points > 0 else -1 * value
+                if outcome > best_outcome:
+                    best_outcome = outcome
+                    best_index = index
+        runner._memo.store(
+            graph.key, best_outcome, graph.num_edges, *window,
+            graph.canonical_move(best_index)
+        )
+        return best_outcome
+
+    def _solve_batch(self,
+        tasks: List[Tuple[int, int, int, int, int, int, int]]
+    ) -> List[int]:
+        memo = self.runner._memo
+        values: List[int] = []
+        for value, num_probes, num_hits, num_nodes in self.pool.imap(
+            _solve_parallel_task, tasks
+        ):
+            values.append(value)
+            memo.num_probes += num_probes
+            memo.num_hits += num_hits
+            self.runner.num_nodes += num_nodes
+        return values
+
+def solve_parallel(
+    edges: List[Tuple[int, int]], processes: int,
+    canonicalizer: str = 'refine', num_slots: int = 1 << 20,
+    split_depth: int = 6, ordering: Tuple[str, ...] = DEFAULT_ORDERING,
+    orbit_depth: int = 1
+) -> Tuple[int, str, int]:
+    """Solve with a `ParallelSearch` over `processes` worker processes.
+
+    Returns the net score, the shared table's hit summary and the number of
+    nodes searched across all processes.
+    """
+    table = SharedTranspositionTable(num_slots)
+    try:
+        runner = GameRunner(
+            edges, canonicalizer=canonicalizer, memo=table,
+            show_progress=False, ordering=ordering,
+            orbit_depth=orbit_depth
+        )
+        with multiprocessing.Pool(
+            processes, _init_parallel_worker,
+            (runner.edges, canonicalizer, table.name, table.num_slots,
+             ordering, orbit_depth)
+        ) as pool:
+            net_score = ParallelSearch(runner, pool, split_depth).solve()
+        return (net_score, table.hit_summary(), runner.num_nodes)
+    finally:
+        table.close()
+
+class SweepResult(NamedTuple):
+    size: int
+    num_vertices: int
+    net_score: int
+    seconds: float
+
+SIZE_HEADERS = {
+    'complete': 'Number of Vertices',
+    'wheel': 'Number of Spokes',
+    'loopy_star': 'Number of Spokes',
+    'friendship': 'Number of Loops',
+}
+
+def parse_range(text: str) -> List[int]:
+    """Sizes for a range like '3..12' (both ends included)."""
+    first, _, last = text.partition('..')
+    if not last:
+        raise ValueError(f'Expected a range like 3..12, got: {text}')
+    return list(range(int(first), int(last) + 1))
+
+def _solve_family_members(
+    src_type: str, sizes: List[int], params: List[int],
+    canonicalizer: str, max_memo_entries: Optional[int],
+    max_memo_bytes: Optional[int], save_memo: bool,
+    ordering: Tuple[str, ...], orbit_depth: int
+) -> List[SweepResult]:
+    # Members are solved smallest first against one memo, so whatever the
+    # smaller ones settled is already there for the larger ones.
+    memo = budgeted_memo(max_memo_entries, max_memo_bytes)
+    store = MemoStore('net_scores.db')
+    memo.attach_store(store, write_back=save_memo)
+    results: List[SweepResult] = []
+    for size in sorted(sizes):
+        runner = GameRunner(
+            edges_for_type(src_type, [size] + params),
+            canonicalizer=canonicalizer,
+            memo=memo,
+            show_progress=False,
+            ordering=ordering,
+            orbit_depth=orbit_depth
+        )
+        start_time = time.perf_counter()
+        net_score = runner.solve()
+        results.append(SweepResult(
+            size,
+            runner._initial_graph.num_vertices,
+            net_score,
+            time.perf_counter() - start_time
+        ))
+    if save_memo:
+        memo.flush()
+    store.close()
+    return results
+
+def sweep(
+    src_type: str, sizes: List[int], params: List[int], workers: int = 1,
+    canonicalizer: str = 'refine', max_memo_entries: Optional[int] = None,
+    max_memo_bytes: Optional[int] = None, save_memo: bool = False,
+    ordering: Tuple[str, ...] = DEFAULT_ORDERING, orbit_depth: int = 1
+) -> List[SweepResult]:
+    """Solve a family of graphs, one member per size.
+
+    The size is the first parameter of the edge source and `params` are the
+    rest. With several workers, each takes every workers-th size, so each
+    still solves a spread of sizes in increasing order with its own memo.
+    """
+    options = (
+        params, canonicalizer, max_memo_entries, max_memo_bytes, save_memo,
+        ordering, orbit_depth
+    )
+    if workers <= 1:
+        return _solve_family_members(src_type, sizes, *options)
+    sizes = sorted(sizes)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                _solve_family_members, src_type, sizes[i::workers], *options
+            )
+            for i in range(min(workers, len(sizes)))
+        ]
+        results = [r for future in futures for r in future.result()]
+    return sorted(results)
+
+def sweep_table(src_type: str, results: List[SweepResult]) -> str:
+    """A Markdown table of sweep results, laid out like the README's."""
+    lines = [
+        f'| {SIZE_HEADERS.get(src_type, "Size")} | Winner | Score | Seconds |',
+        '| -------- | ------- | ------- | ------- |'
+    ]
+    for r in results:
+        first_player_score = (r.num_vertices + r.net_score) // 2
+        second_player_score = (r.num_vertices - r.net_score) // 2
+        if r.net_score == 0:
+            winner = 'Tie'
+        else:
+            winner = 'P1' if r.net_score > 0 else 'P2'
+        lines.append(
+            f'| {r.size} | {winner} | ' +
+            f'({first_player_score} - {second_player_score}) | ' +
+            f'{r.seconds:.2f} |'
+        )
+    return '\n'.join(lines) + '\n'
+
+class OrderingResult(NamedTuple):
+    ordering: Tuple[str, ...]
+    net_score: int
+    num_nodes: int
+    seconds: float
+
+def compare_orderings(
+    edges: List[Tuple[int, int]], orderings: List[Tuple[str, ...]],
+    canonicalizer: str = 'refine', orbit_depth: int = 1
+) -> List[OrderingResult]:
+    """Solve one graph once per move ordering, each with a fresh memo."""
+    results: List[OrderingResult] = []
+    for ordering in orderings:
+        runner = GameRunner(
+            edges, canonicalizer=canonicalizer, show_progress=False,
+            ordering=ordering, orbit_depth=orbit_depth
+        )
+        start_time = time.perf_counter()
+        net_score = runner.solve()
+        results.append(OrderingResult(
+            ordering,
+            net_score,
+            runner.num_nodes,
+            time.perf_counter() - start_time
+        ))
+    return results
+
+def ordering_table(results: List[OrderingResult]) -> str:
+    """A Markdown table of node counts and times per move ordering."""
+    lines = [
+        '| Move Ordering | Net Score | Nodes | Seconds |',
+        '| -------- | ------- | ------- | ------- |'
+    ]
+    for r in results:
+        lines.append(
+            f'| {",".join(r.ordering) or "none"} | {r.net_score} | ' +
+            f'{r.num_nodes} | {r.seconds:.2f} |'
+        )
+    return '\n'.join(lines) + '\n'
+
 def main():
     parser = argparse.ArgumentParser(
         description='Solve a game.'
@@ -409,22 +1512,188 @@ def main():
         default=False,
         help='Save the memo for future use (defaults to False).'
     )
+    parser.add_argument(
+        '--range',
+        default=None,
+        type=str,
+        help='Sweep the first parameter over a range like 3..12, solving ' +
+        'each size and printing a results table (defaults to no sweep).'
+    )
+    parser.add_argument(
+        '--processes',
+        default=1,
+        type=int,
+        help='Processes to search a single graph with, sharing one ' +
+        'transposition table in shared memory (defaults to 1).'
+    )
+    parser.add_argument(
+        '--table_slots',
+        default=1 << 20,
+        type=int,
+        help='Slots in the shared transposition table used with ' +
+        '--processes (defaults to 1048576).'
+    )
+    parser.add_argument(
+        '--split_depth',
+        default=6,
+        type=int,
+        help='Plies at the top of the search that --processes splits ' +
+        'over the pool (defaults to 6).'
+    )
+    parser.add_argument(
+        '--workers',
+        default=1,
+        type=int,
+        help='Processes to spread a sweep over (defaults to 1).'
+    )
+    parser.add_argument(
+        '--table_file',
+        default=None,
+        type=str,
+        help='File to also write the sweep results table to.'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        default=False,
+        help='Replay the journal of an interrupted run and skip the root ' +
+        'moves it finished (defaults to False).'
+    )
+    parser.add_argument(
+        '--max_memo_entries',
+        default=None,
+        type=int,
+        help='Cap on the number of memo entries, and on the entries of ' +
+        'each position cache (defaults to no cap).'
+    )
+    parser.add_argument(
+        '--max_memo_mb',
+        default=None,
+        type=float,
+        help='Cap on the estimated size in MB of the memo and the ' +
+        'position caches, which get a quarter of it (defaults to no cap).'
+    )
+    parser.add_argument(
+        '--canonicalizer',
+        default='refine',
+        choices=CANONICALIZERS,
+        help='How positions are keyed in the memo: "refine" (colour ' +
+        'refinement with greedy tie-breaks) or "ir" (individualization-' +
+        'refinement, a true canonical form). Defaults to "refine".'
+    )
+    parser.add_argument(
+        '--move_ordering',
+        default=','.join(DEFAULT_ORDERING),
+        type=parse_ordering,
+        help='Comma-separated move ordering stages, most significant ' +
+        'first, from ' + ', '.join(ORDERING_STAGES) + ', or "none" ' +
+        '(defaults to ' + ','.join(DEFAULT_ORDERING) + ').'
+    )
+    parser.add_argument(
+        '--compare_orderings',
+        default=None,
+        type=parse_ordering,
+        nargs='+',
+        help='Solve once per move ordering given and print a table of ' +
+        'node counts and times (defaults to no comparison).'
+    )
+    parser.add_argument(
+        '--orbit_depth',
+        default=1,
+        type=int,
+        help='Plies at the top of the search that try one move per orbit ' +
+        'of edges under automorphism (defaults to 1, the root only).'
+    )
+    parser.add_argument(
+        '--time_budget',
+        default=None,
+        type=float,
+        help='Seconds to search for; when they run out, print the bounds ' +
+        'on the net score proven so far (defaults to no limit).'
+    )
+    parser.add_argument(
+        '--metrics_file',
+        default=None,
+        type=str,
+        help='File to write search metrics to as JSON: nodes per second, ' +
+        'memo hits, time spent canonicalizing and generating moves, nodes ' +
+        'per depth and samples over time (defaults to no metrics).'
+    )
+    parser.add_argument(
+        '--metrics_interval',
+        default=1.0,
+        type=float,
+        help='Seconds between metrics samples (defaults to 1.0).'
+    )
     args = parser.parse_args()
     save_memo: bool = args.save_memo
     src_type: str = args.type
     params: List[int] = args.params
 
-    if src_type == 'file':
-        edges = edges_from_input_file()
-    elif src_type == 'm_by_n':
-        edges = edges_for_m_by_n_grid(params[0], params[1])
-    elif src_type == 'complete':
-        edges = edges_for_complete_graph(params[0])
-    elif src_type == 'wheel':
-        edges = edges_for_wheel(params[0])
-    else:
-        raise ValueError(f'Unrecognized edge source type: {src_type}')
-    GameRunner(edges).run(save_memo)
+    max_memo_bytes = None
+    if args.max_memo_mb is not None:
+        max_memo_bytes = int(args.max_memo_mb * 1024 * 1024)
+    if args.range is not None:
+        results = sweep(
+            src_type,
+            parse_range(args.range),
+            params,
+            workers=args.workers,
+            canonicalizer=args.canonicalizer,
+            max_memo_entries=args.max_memo_entries,
+            max_memo_bytes=max_memo_bytes,
+            save_memo=save_memo,
+            ordering=args.move_ordering,
+            orbit_depth=args.orbit_depth
+        )
+        table = sweep_table(src_type, results)
+        print(table, end='')
+        if args.table_file is not None:
+            with open(args.table_file, 'w') as file:
+                file.write(table)
+        return
+    if args.compare_orderings is not None:
+        print(ordering_table(compare_orderings(
+            edges_for_type(src_type, params),
+            args.compare_orderings,
+            canonicalizer=args.canonicalizer,
+            orbit_depth=args.orbit_depth
+        )), end='')
+        return
+    if args.processes > 1:
+        if save_memo or args.resume or args.time_budget is not None:
+            parser.error(
+                '--processes can\'t be used with --save_memo, --resume or ' +
+                '--time_budget'
+            )
+        net_score, summary, num_nodes = solve_parallel(
+            edges_for_type(src_type, params),
+            args.processes,
+            canonicalizer=args.canonicalizer,
+            num_slots=args.table_slots,
+            split_depth=args.split_depth,
+            ordering=args.move_ordering,
+            orbit_depth=args.orbit_depth
+        )
+        print_net_score(net_score)
+        print(summary)
+        print(f'nodes:{num_nodes}')
+        return
+    metrics = None
+    if args.metrics_file is not None:
+        metrics = SearchMetrics(args.metrics_interval)
+    runner = GameRunner(
+        edges_for_type(src_type, params),
+        canonicalizer=args.canonicalizer,
+        max_memo_entries=args.max_memo_entries,
+        max_memo_bytes=max_memo_bytes,
+        ordering=args.move_ordering,
+        orbit_depth=args.orbit_depth,
+        metrics=metrics
+    )
+    runner.run(save_memo, args.resume, args.time_budget)
+    if metrics is not None:
+        runner.write_metrics(args.metrics_file)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
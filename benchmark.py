@@ -0,0 +1,257 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+import algorithm
+import algorithm_MD
+from canonical_labeling import CanonicalLabeling
+from transposition import TranspositionTable
+
+class Instance(NamedTuple):
+    name: str
+    edges: Callable[[], List[Tuple[int, int]]]
+
+# One fixed instance per built-in generator, each small enough to solve in
+# seconds. Both solvers get the same edge list.
+INSTANCES = [
+    Instance(
+        'm_by_n 2 3', lambda: algorithm_MD.edges_for_m_by_n_grid(2, 3)
+    ),
+    Instance('wheel 7', lambda: algorithm_MD.edges_for_wheel(7)),
+    Instance(
+        'complete 6', lambda: algorithm_MD.edges_for_complete_graph(6)
+    ),
+    Instance(
+        'friendship 3 4',
+        lambda: list(algorithm.create_friendship_graph(3, 4).edges())
+    ),
+    # Three loops per spoke, since HangingStar settles two or fewer at the
+    # root without a search.
+    Instance(
+        'loopy_star 7 3',
+        lambda: list(algorithm.create_loopy_star(7, 3).edges())
+    ),
+    Instance(
+        'double_ngon 4',
+        lambda: list(algorithm.create_double_ngon_graph(4).edges())
+    ),
+    Instance('hypercube 3', lambda: algorithm_MD.edges_for_hypercube(3)),
+]
+
+SOLVERS = ('algorithm', 'algorithm_MD')
+
+# Metrics compared against a baseline, where more is worse.
+COMPARED_METRICS = ('seconds', 'nodes', 'peak_rss_kb', 'microseconds')
+
+def _solve_case(
+    solver: str, instance_index: int, canonicalizer: str, repeat: int
+) -> Dict[str, Any]:
+    # Run in a fresh process, so the peak RSS is this case's alone.
+    edges = INSTANCES[instance_index].edges()
+    best_seconds = None
+    for _ in range(repeat):
+        memo = TranspositionTable()
+        start_time = time.perf_counter()
+        if solver == 'algorithm':
+            net_score = algorithm.solve(
+                algorithm.EdgeGraph(edges), memo, canonicalizer,
+                show_progress=False
+            )
+            num_nodes = algorithm._progress['nodes']
+        else:
+            runner = algorithm_MD.GameRunner(
+                edges, canonicalizer=canonicalizer, memo=memo,
+                show_progress=False, use_tablebase=False
+            )
+            net_score = runner.solve()
+            num_nodes = runner.num_nodes
+        seconds = time.perf_counter() - start_time
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+    return {
+        'net_score': net_score,
+        'seconds': round(best_seconds, 4),
+        'nodes': num_nodes,
+        'memo_entries': len(memo),
+        'memo_probes': memo.num_probes,
+        'memo_hits': memo.num_hits,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def _canonicalizer_case(instance_index: int, repeat: int) -> Dict[str, Any]:
+    # Microseconds per call on the instance's full edge list, best of five
+    # rounds of `repeat` calls.
+    edges = INSTANCES[instance_index].edges()
+    graph = algorithm.EdgeGraph(edges)
+    calls = {
+        'CanonicalEdges': lambda: algorithm_MD.CanonicalEdges(edges).calc(),
+        'CanonicalLabeling': lambda: CanonicalLabeling(edges).calc(),
+        'algorithm.CanonicalEdges':
+            lambda: algorithm.CanonicalEdges(graph).calc(),
+    }
+    results = {}
+    for name, call in calls.items():
+        best = None
+        for _ in range(5):
+            start_time = time.perf_counter()
+            for _ in range(repeat):
+                call()
+            seconds = (time.perf_counter() - start_time) / repeat
+            if best is None or seconds < best:
+                best = seconds
+        results[name] = {'microseconds': round(best * 1e6, 1)}
+    return results
+
+def run_benchmarks(
+    names: Optional[List[str]] = None, canonicalizer: str = 'refine',
+    repeat: int = 3, canonicalizer_repeat: int = 200
+) -> Dict[str, Any]:
+    """Solve every instance with both solvers and time the canonicalizers.
+
+    Each solve runs `repeat` times with a fresh memo in a fresh process and
+    keeps the best time. Results are keyed 'solver/instance' and
+    'canonicalizer/instance'.
+    """
+    results: Dict[str, Any] = {}
+    for index, instance in enumerate(INSTANCES):
+        if names and instance.name not in names:
+            continue
+        scores = set()
+        for solver in SOLVERS:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(
+                    _solve_case, solver, index, canonicalizer, repeat
+                ).result()
+            scores.add(result['net_score'])
+            results[f'{solver}/{instance.name}'] = result
+        if len(scores) > 1:
+            raise RuntimeError(
+                f'The solvers disagree on {instance.name}: {sorted(scores)}'
+            )
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            micro = pool.submit(
+                _canonicalizer_case, index, canonicalizer_repeat
+            ).result()
+        for name, result in micro.items():
+            results[f'{name}/{instance.name}'] = result
+    return {
+        'python': platform.python_version(),
+        'canonicalizer': canonicalizer,
+        'results': results,
+    }
+
+def regressions(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+    min_seconds: float = 0.05
+) -> List[str]:
+    """Every metric more than `threshold` (a fraction) worse than baseline.
+
+    Times that differ by under `min_seconds` are taken as noise.
+    """
+    found = []
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in result or metric not in base:
+                continue
+            new, old = result[metric], base[metric]
+            if metric == 'seconds' and new - old < min_seconds:
+                continue
+            if new > old * (1 + threshold):
+                found.append(
+                    f'{key} {metric}: {old} -> {new} ' +
+                    f'(+{(new - old) / old if old else float("inf"):.0%})'
+                )
+    return found
+
+def results_table(
+    current: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None
+) -> str:
+    """A Markdown table of the results, with the baseline's if given."""
+    lines = [
+        '| Case | Seconds | Nodes | Memo Entries | Peak RSS (KB) | ' +
+        'Microseconds | Baseline Seconds |',
+        '| -------- | ------- | ------- | ------- | ------- | ------- | ' +
+        '------- |'
+    ]
+    for key, r in current['results'].items():
+        base = {} if baseline is None else baseline['results'].get(key, {})
+        lines.append(
+            f'| {key} | {r.get("seconds", "")} | {r.get("nodes", "")} | ' +
+            f'{r.get("memo_entries", "")} | {r.get("peak_rss_kb", "")} | ' +
+            f'{r.get("microseconds", "")} | ' +
+            f'{base.get("seconds", base.get("microseconds", ""))} |'
+        )
+    return '\n'.join(lines) + '\n'
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark both solvers and the canonicalizers on ' +
+        'fixed instances.'
+    )
+    parser.add_argument(
+        '--only',
+        default=None,
+        type=str,
+        nargs='+',
+        help='Instance names to run, such as "wheel 7" (defaults to all).'
+    )
+    parser.add_argument(
+        '--canonicalizer',
+        default='refine',
+        choices=algorithm_MD.CANONICALIZERS,
+        help='How positions are keyed in the memo (defaults to "refine").'
+    )
+    parser.add_argument(
+        '--repeat',
+        default=3,
+        type=int,
+        help='Solves per case; the best time is kept (defaults to 3).'
+    )
+    parser.add_argument(
+        '--save_baseline',
+        default=None,
+        type=str,
+        help='File to save the results to as a JSON baseline (defaults ' +
+        'to not saving).'
+    )
+    parser.add_argument(
+        '--baseline',
+        default=None,
+        type=str,
+        help='JSON baseline to compare against; exits with status 1 if ' +
+        'anything regressed (defaults to no comparison).'
+    )
+    parser.add_argument(
+        '--threshold',
+        default=0.25,
+        type=float,
+        help='Fraction a metric may worsen by before it counts as a ' +
+        'regression (defaults to 0.25).'
+    )
+    args = parser.parse_args()
+    current = run_benchmarks(args.only, args.canonicalizer, args.repeat)
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print(results_table(current, baseline), end='')
+    if args.save_baseline is not None:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(current, file, indent=2)
+            file.write('\n')
+    if baseline is not None:
+        found = regressions(current, baseline, args.threshold)
+        for line in found:
+            print(f'REGRESSION {line}')
+        if found:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+from typing import Dict, List, Optional, Tuple
+
+Certificate = Tuple[Tuple[int, int], ...]
+
+class CanonicalLabeling:
+    """Canonical labeling by individualization-refinement.
+
+    Unlike `CanonicalEdges`, which breaks ties between equally refined
+    vertices greedily, this explores the search tree of individualizations
+    (as nauty does) and keeps the smallest edge list over all of its
+    leaves, so isomorphic edge lists always get the same result. Two
+    leaves with equal edge lists give an automorphism; those are used to
+    skip children that are equivalent to ones already searched.
+
+    Edges may repeat and may be loops. After `calc`, `canonical_ids` maps
+    each raw vertex to its canonical id and `automorphisms` holds the
+    automorphisms found, as maps from raw vertex to raw vertex.
+    """
+
+    def __init__(self, edges: List[Tuple[int, int]]) -> None:
+        self.edges = edges
+        self._init_vertices()
+
+    def _init_vertices(self) -> None:
+        self._raw_ids: List[int] = []
+        index_for_raw_id: Dict[int, int] = {}
+        for e in self.edges:
+            for v in e:
+                if v not in index_for_raw_id:
+                    index_for_raw_id[v] = len(self._raw_ids)
+                    self._raw_ids.append(v)
+        self._num_vertices = len(self._raw_ids)
+        self._edges = [
+            (index_for_raw_id[v0], index_for_raw_id[v1])
+            for v0, v1 in self.edges
+        ]
+        self._adjacency: List[Dict[int, int]] = [
+            {} for _ in range(self._num_vertices)
+        ]
+        for v0, v1 in self._edges:
+            self._adjacency[v0][v1] = self._adjacency[v0].get(v1, 0) + 1
+            if v1 != v0:
+                self._adjacency[v1][v0] = self._adjacency[v1].get(v0, 0) + 1
+
+    def calc(self) -> List[Tuple[int, int]]:
+        self._first_path: Optional[List[int]] = None
+        self._first_leaf: Optional[Tuple[Certificate, List[int]]] = None
+        self._best_path: Optional[List[int]] = None
+        self._best_leaf: Optional[Tuple[Certificate, List[int]]] = None
+        self._generators: List[List[int]] = []
+        self.num_leaves = 0
+        self._search(self._initial_partition(), [])
+        certificate, order = self._best_leaf
+        self.canonical_ids: Dict[int, int] = {
+            self._raw_ids[v]: i for i, v in enumerate(order)
+        }
+        self.automorphisms: List[Dict[int, int]] = [
+            {self._raw_ids[v]: self._raw_ids[w] for v, w in enumerate(g)}
+            for g in self._generators
+        ]
+        return list(certificate)
+
+    def edge_orbits(self) -> List[List[int]]:
+        """Indices into `edges` grouped into orbits, after `calc`.
+
+        These are orbits of the group generated by `automorphisms`, which
+        may be finer than the orbits of the full automorphism group but
+        never coarser, so any edge of an orbit stands for the rest.
+        Repeats of an edge share its orbit.
+        """
+        parent = list(range(len(self._edges)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int) -> None:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        index_for_edge: Dict[Tuple[int, int], int] = {}
+        for i, (v0, v1) in enumerate(self._edges):
+            edge = (min(v0, v1), max(v0, v1))
+            union(i, index_for_edge.setdefault(edge, i))
+        for g in self._generators:
+            for i, (v0, v1) in enumerate(self._edges):
+                image = (min(g[v0], g[v1]), max(g[v0], g[v1]))
+                union(i, index_for_edge[image])
+        orbits: Dict[int, List[int]] = {}
+        for i in range(len(self._edges)):
+            orbits.setdefault(find(i), []).append(i)
+        return [orbits[root] for root in sorted(orbits)]
+
+    def _initial_partition(self) -> List[List[int]]:
+        cells_for_key: Dict[Tuple[int, int], List[int]] = {}
+        for v in range(self._num_vertices):
+            num_loops = self._adjacency[v].get(v, 0)
+            degree = sum(self._adjacency[v].values()) + num_loops
+            cells_for_key.setdefault((degree, -1 * num_loops), []).append(v)
+        return [cells_for_key[key] for key in sorted(cells_for_key)]
+
+    def _refine(self, cells: List[List[int]]) -> List[List[int]]:
+        # Split cells by the number of edges into each splitter cell until
+        # the partition is equitable. Fragments are ordered by that count,
+        # so the result doesn't depend on how the vertices are numbered.
+        cell_for_vertex = [0] * self._num_vertices
+        for i, cell in enumerate(cells):
+            for v in cell:
+                cell_for_vertex[v] = i
+        splitters = list(range(len(cells)))
+        while splitters and len(cells) < self._num_vertices:
+            splitter = splitters.pop(0)
+            split_any = False
+            new_cells: List[List[int]] = []
+            for cell in cells:
+                if len(cell) == 1:
+                    new_cells.append(cell)
+                    continue
+                cell_for_count: Dict[int, List[int]] = {}
+                for v in cell:
+                    count = 0
+                    for n, multiplicity in self._adjacency[v].items():
+                        if cell_for_vertex[n] == splitter:
+                            count += multiplicity
+                    cell_for_count.setdefault(count, []).append(v)
+                if len(cell_for_count) == 1:
+                    new_cells.append(cell)
+                else:
+                    split_any = True
+                    for count in sorted(cell_for_count):
+                        new_cells.append(cell_for_count[count])
+            if split_any:
+                cells = new_cells
+                for i, cell in enumerate(cells):
+                    for v in cell:
+                        cell_for_vertex[v] = i
+                splitters = list(range(len(cells)))
+        return cells
+
+    def _individualize(self,
+        cells: List[List[int]], index: int, vertex: int
+    ) -> List[List[int]]:
+        rest = [v for v in cells[index] if v != vertex]
+        return cells[:index] + [[vertex], rest] + cells[index + 1:]
+
+    def _search(self, cells: List[List[int]], path: List[int]) -> int:
+        """Search below `path`; returns the level to jump back to."""
+        cells = self._refine(cells)
+        if len(cells) == self._num_vertices:
+            return self._leaf([cell[0] for cell in cells], path)
+        index = 0
+        while len(cells[index]) == 1:
+            index += 1
+        searched: List[int] = []
+        for v in sorted(cells[index]):
+            if self._is_equivalent_to_searched(v, searched, path):
+                continue
+            searched.append(v)
+            level = self._search(
+                self._individualize(cells, index, v), path + [v]
+            )
+            if level < len(path):
+                return level
+        return len(path)
+
+    def _leaf(self, order: List[int], path: List[int]) -> int:
+        self.num_leaves += 1
+        label = [0] * self._num_vertices
+        for i, v in enumerate(order):
+            label[v] = i
+        certificate: Certificate = tuple(sorted(
+            (min(label[v0], label[v1]), max(label[v0], label[v1]))
+            for v0, v1 in self._edges
+        ))
+        if self._first_leaf is None:
+            self._first_path = path
+            self._first_leaf = (certificate, order)
+            self._best_path = path
+            self._best_leaf = (certificate, order)
+            return len(path)
+        for reference_path, reference in (
+            (self._first_path, self._first_leaf),
+            (self._best_path, self._best_leaf)
+        ):
+            if certificate == reference[0]:
+                # The map between the two leaves is an automorphism, and it
+                # maps the subtree where the paths part onto one that has
+                # already been searched.
+                automorphism = [0] * self._num_vertices
+                for v, w in zip(reference[1], order):
+                    automorphism[v] = w
+                self._generators.append(automorphism)
+                return self._common_prefix_length(path, reference_path)
+        if certificate < self._best_leaf[0]:
+            self._best_path = path
+            self._best_leaf = (certificate, order)
+        return len(path)
+
+    def _common_prefix_length(self, path: List[int], other: List[int]) -> int:
+        length = 0
+        while (
+            length < len(path) and length < len(other)
+            and path[length] == other[length]
+        ):
+            length += 1
+        return length
+
+    def _is_equivalent_to_searched(self,
+        vertex: int, searched: List[int], path: List[int]
+    ) -> bool:
+        if not searched:
+            return False
+        # Orbits under the automorphisms found so far that fix every vertex
+        # on the path; any of them maps this subtree onto a searched one.
+        parent = list(range(self._num_vertices))
+
+        def find(v: int) -> int:
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        for g in self._generators:
+            if all(g[v] == v for v in path):
+                for v, w in enumerate(g):
+                    root_v, root_w = find(v), find(w)
+                    if root_v != root_w:
+                        parent[root_v] = root_w
+        root = find(vertex)
+        return any(find(v) == root for v in searched)
+
+def canonical_ids_for(
+    edges: List[Tuple[int, int]]
+) -> Tuple[List[Tuple[int, int]], Dict[int, int]]:
+    labeling = CanonicalLabeling(edges)
+    canonical_edges = labeling.calc()
+    return (canonical_edges, labeling.canonical_ids)
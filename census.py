@@ -0,0 +1,233 @@
+from typing import (
+    Deque, Iterable, Iterator, NamedTuple, Optional, TextIO, Tuple
+)
+from collections import deque
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+from algorithm_MD import (
+    GameRunner, CANONICALIZERS, DEFAULT_ORDERING, ORDERING_STAGES,
+    parse_ordering
+)
+from shared_table import SharedTranspositionTable
+from non_isomorphic_graphs import (
+    non_isomorphic_edge_deletions, to_graph6, from_graph6
+)
+
+class CensusResult(NamedTuple):
+    index: int
+    graph6: str
+    num_vertices: int
+    num_edges: int
+    winner: str
+    net_score: int
+    seconds: float
+
+CENSUS_FIELDS = CensusResult._fields
+
+_worker_table: Optional[SharedTranspositionTable] = None
+_worker_options: Tuple[str, Tuple[str, ...], int] = (
+    'refine', DEFAULT_ORDERING, 1
+)
+
+def _init_census_worker(
+    table_name: str, num_slots: int, canonicalizer: str,
+    ordering: Tuple[str, ...], orbit_depth: int
+) -> None:
+    global _worker_table, _worker_options
+    _worker_table = SharedTranspositionTable(num_slots, table_name)
+    _worker_options = (canonicalizer, ordering, orbit_depth)
+
+def _solve_census_task(task: Tuple[int, str]) -> CensusResult:
+    index, graph6 = task
+    _, edges = from_graph6(graph6)
+    canonicalizer, ordering, orbit_depth = _worker_options
+    start_time = time.perf_counter()
+    runner = GameRunner(
+        edges,
+        canonicalizer=canonicalizer,
+        memo=_worker_table,
+        show_progress=False,
+        ordering=ordering,
+        orbit_depth=orbit_depth
+    )
+    net_score = runner.solve()
+    if net_score == 0:
+        winner = 'Tie'
+    else:
+        winner = 'P1' if net_score > 0 else 'P2'
+    return CensusResult(
+        index,
+        graph6,
+        len({v for e in edges for v in e}),
+        len(edges),
+        winner,
+        net_score,
+        time.perf_counter() - start_time
+    )
+
+def census(
+    graphs: Iterable[str], processes: int = 1, canonicalizer: str = 'refine',
+    num_slots: int = 1 << 20, ordering: Tuple[str, ...] = DEFAULT_ORDERING,
+    orbit_depth: int = 1
+) -> Iterator[CensusResult]:
+    """Solve a stream of graph6 graphs, yielding results in input order.
+
+    Every graph is solved against one `SharedTranspositionTable`, so the
+    sub-positions the graphs have in common are searched once. Graphs are
+    read from `graphs` only a few per process ahead of the results, and the
+    table has a fixed size, so memory stays flat however long the stream.
+    """
+    table = SharedTranspositionTable(num_slots)
+    options = (table.name, table.num_slots, canonicalizer, ordering,
+               orbit_depth)
+    tasks = enumerate(line.strip() for line in graphs if line.strip())
+    try:
+        if processes <= 1:
+            _init_census_worker(*options)
+            for task in tasks:
+                yield _solve_census_task(task)
+            return
+        with multiprocessing.Pool(
+            processes, _init_census_worker, options
+        ) as pool:
+            pending: Deque[multiprocessing.pool.AsyncResult] = deque()
+            for task in tasks:
+                pending.append(pool.apply_async(_solve_census_task, (task,)))
+                if len(pending) >= 4 * processes:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+    finally:
+        table.close()
+
+def write_census(
+    results: Iterable[CensusResult], out: TextIO, file_format: str = 'jsonl'
+) -> int:
+    """Write each result as soon as it's done; returns how many there were."""
+    writer = None
+    if file_format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(CENSUS_FIELDS)
+    count = 0
+    for result in results:
+        if writer is None:
+            out.write(json.dumps(result._asdict()) + '\n')
+        else:
+            writer.writerow(result)
+        out.flush()
+        count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Solve every graph of a stream of graph6 lines, such ' +
+        'as the output of non_isomorphic_graphs.py.'
+    )
+    parser.add_argument(
+        '--input',
+        default='-',
+        type=str,
+        help='File of graph6 lines to solve, or "-" for standard input ' +
+        '(defaults to "-").'
+    )
+    parser.add_argument(
+        '--n',
+        default=None,
+        type=int,
+        help='Instead of reading graphs, enumerate the subgraphs of K_n ' +
+        'with --k edges deleted (defaults to reading graphs).'
+    )
+    parser.add_argument(
+        '--k',
+        default=0,
+        type=int,
+        help='Edges to delete from K_n with --n (defaults to 0).'
+    )
+    parser.add_argument(
+        '--output',
+        default='-',
+        type=str,
+        help='File to write results to, or "-" for standard output ' +
+        '(defaults to "-").'
+    )
+    parser.add_argument(
+        '--format',
+        default='jsonl',
+        choices=['jsonl', 'csv'],
+        help='Format to write results in (defaults to "jsonl").'
+    )
+    parser.add_argument(
+        '--processes',
+        default=1,
+        type=int,
+        help='Processes to solve graphs with, sharing one transposition ' +
+        'table in shared memory (defaults to 1).'
+    )
+    parser.add_argument(
+        '--table_slots',
+        default=1 << 20,
+        type=int,
+        help='Slots in the shared transposition table (defaults to 1048576).'
+    )
+    parser.add_argument(
+        '--canonicalizer',
+        default='refine',
+        choices=CANONICALIZERS,
+        help='How positions are keyed in the memo: "refine" or "ir" ' +
+        '(defaults to "refine").'
+    )
+    parser.add_argument(
+        '--move_ordering',
+        default=','.join(DEFAULT_ORDERING),
+        type=parse_ordering,
+        help='Comma-separated move ordering stages, most significant ' +
+        'first, from ' + ', '.join(ORDERING_STAGES) + ', or "none" ' +
+        '(defaults to ' + ','.join(DEFAULT_ORDERING) + ').'
+    )
+    parser.add_argument(
+        '--orbit_depth',
+        default=1,
+        type=int,
+        help='Plies at the top of the search that try one move per orbit ' +
+        'of edges under automorphism (defaults to 1, the root only).'
+    )
+    args = parser.parse_args()
+    if args.n is not None:
+        graphs = (
+            to_graph6(args.n, edges)
+            for edges in non_isomorphic_edge_deletions(args.n, args.k)
+        )
+    elif args.input == '-':
+        graphs = sys.stdin
+    else:
+        graphs = open(args.input)
+    out = sys.stdout
+    if args.output != '-':
+        out = open(args.output, 'w', newline='')
+    start_time = time.perf_counter()
+    count = write_census(
+        census(
+            graphs,
+            processes=args.processes,
+            canonicalizer=args.canonicalizer,
+            num_slots=args.table_slots,
+            ordering=args.move_ordering,
+            orbit_depth=args.orbit_depth
+        ),
+        out,
+        args.format
+    )
+    if out is not sys.stdout:
+        out.close()
+    print(
+        f'solved {count} graphs in ' +
+        f'{time.perf_counter() - start_time:.1f} seconds',
+        file=sys.stderr
+    )
+
+if __name__ == '__main__':
+    main()
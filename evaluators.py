@@ -0,0 +1,234 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+class DegreeProfile:
+    """Per-vertex loop counts and non-loop neighbors of a position."""
+
+    def __init__(self, edges: List[Tuple[int, int]]) -> None:
+        self.loops: Dict[int, int] = {}
+        self.neighbors: Dict[int, List[int]] = {}
+        for v0, v1 in edges:
+            for v in (v0, v1):
+                if v not in self.neighbors:
+                    self.neighbors[v] = []
+                    self.loops[v] = 0
+            if v0 == v1:
+                self.loops[v0] += 1
+            else:
+                self.neighbors[v0].append(v1)
+                self.neighbors[v1].append(v0)
+
+    def degree(self, vertex: int) -> int:
+        return len(self.neighbors[vertex])
+
+    def is_connected(self) -> bool:
+        start = next(iter(self.neighbors))
+        seen = {start}
+        stack = [start]
+        while stack:
+            for n in self.neighbors[stack.pop()]:
+                if n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        return len(seen) == len(self.neighbors)
+
+class Evaluator:
+    """Recognises one class of positions and scores it without searching.
+
+    `applies` is a cheap test on the position's counts that every member of
+    the class passes; `evaluate` then checks the structure and returns the
+    net score for the player to move, or None if the position isn't one.
+    """
+
+    def applies(self,
+        num_edges: int, num_vertices: int, num_loops: int
+    ) -> bool:
+        raise NotImplementedError
+
+    def evaluate(self, edges: List[Tuple[int, int]]) -> Optional[int]:
+        raise NotImplementedError
+
+class CycleWithLeaves(Evaluator):
+    """A single cycle (no loops) with any number of leaves hung off it.
+
+    Eating a leaf keeps the turn and any cut on the cycle leaves a tree for
+    the opponent, so the mover eats every leaf and then gives up the cycle:
+    num_vertices - 2 * cycle_length.
+    """
+
+    def applies(self,
+        num_edges: int, num_vertices: int, num_loops: int
+    ) -> bool:
+        return num_loops == 0 and num_edges == num_vertices
+
+    def evaluate(self, edges: List[Tuple[int, int]]) -> Optional[int]:
+        profile = DegreeProfile(edges)
+        cycle_length = 0
+        for v, neighbors in profile.neighbors.items():
+            if len(neighbors) == 1:
+                if profile.degree(neighbors[0]) == 1:
+                    return None
+                continue
+            num_leaves = sum(1 for n in neighbors if profile.degree(n) == 1)
+            if len(neighbors) - num_leaves != 2:
+                return None
+            cycle_length += 1
+        if not profile.is_connected():
+            return None
+        return len(profile.neighbors) - 2 * cycle_length
+
+class LoopsOnly(Evaluator):
+    """Vertices that are only held by loops.
+
+    A vertex with a single loop is a free point for the mover. The m
+    vertices holding two or more loops split evenly when m is even; when m
+    is odd, the mover gets the extra one exactly when those vertices hold
+    an odd number of loops between them.
+    """
+
+    def applies(self,
+        num_edges: int, num_vertices: int, num_loops: int
+    ) -> bool:
+        return num_loops == num_edges
+
+    def evaluate(self, edges: List[Tuple[int, int]]) -> Optional[int]:
+        profile = DegreeProfile(edges)
+        free_points = 0
+        num_held = 0
+        num_held_loops = 0
+        for num_loops in profile.loops.values():
+            if num_loops == 1:
+                free_points += 1
+            else:
+                num_held += 1
+                num_held_loops += num_loops
+        if num_held % 2 == 0:
+            return free_points
+        return free_points + (1 if num_held_loops % 2 == 1 else -1)
+
+class HangingStar(Evaluator):
+    """A star whose n outer vertices each carry k loops.
+
+    Only the cases the README lists as proven are recognised: n <= 2 or
+    k <= 2.
+    """
+
+    def applies(self,
+        num_edges: int, num_vertices: int, num_loops: int
+    ) -> bool:
+        return num_loops > 0 and num_edges - num_loops == num_vertices - 1
+
+    def evaluate(self, edges: List[Tuple[int, int]]) -> Optional[int]:
+        profile = DegreeProfile(edges)
+        num_spokes = len(profile.neighbors) - 1
+        if num_spokes == 1:
+            v0, v1 = profile.neighbors
+            num_loops = max(profile.loops[v0], profile.loops[v1])
+            if min(profile.loops[v0], profile.loops[v1]) != 0:
+                return None
+            return 2 if num_loops % 2 == 1 else 0
+        centers = [
+            v for v, neighbors in profile.neighbors.items()
+            if len(neighbors) == num_spokes
+        ]
+        if len(centers) != 1 or profile.loops[centers[0]] != 0:
+            return None
+        spokes = [v for v in profile.neighbors if v != centers[0]]
+        if any(profile.degree(v) != 1 for v in spokes):
+            return None
+        spoke_loops = {profile.loops[v] for v in spokes}
+        if len(spoke_loops) != 1:
+            return None
+        num_loops = spoke_loops.pop()
+        if num_spokes == 2:
+            return -3 if num_loops == 1 else -1
+        if num_loops == 1:
+            return 2 if num_spokes % 2 == 1 else -3
+        if num_loops == 2:
+            return -2 if num_spokes % 2 == 1 else -3
+        return None
+
+class BalloonPath(Evaluator):
+    """A path with one loop on every vertex (see the README table).
+
+    The margins are only known up to `MAX_VERTICES` vertices, where search
+    confirmed them; longer paths are left to search.
+    """
+
+    MAX_VERTICES = 14
+
+    def applies(self,
+        num_edges: int, num_vertices: int, num_loops: int
+    ) -> bool:
+        return (
+            num_vertices <= self.MAX_VERTICES and num_loops == num_vertices
+            and num_edges == 2 * num_vertices - 1
+        )
+
+    def evaluate(self, edges: List[Tuple[int, int]]) -> Optional[int]:
+        profile = DegreeProfile(edges)
+        if any(num_loops != 1 for num_loops in profile.loops.values()):
+            return None
+        if any(len(n) > 2 for n in profile.neighbors.values()):
+            return None
+        if not profile.is_connected():
+            return None
+        n = len(profile.neighbors)
+        if n % 2 == 0:
+            return -2 if n == 2 else 0
+        return 3 if n in (3, 7) else 1
+
+class BalloonCycle(Evaluator):
+    """A cycle with one loop on every vertex (see the README table).
+
+    The margins are only known up to `MAX_VERTICES` vertices, where search
+    confirmed them; longer cycles are left to search.
+    """
+
+    MAX_VERTICES = 14
+
+    def applies(self,
+        num_edges: int, num_vertices: int, num_loops: int
+    ) -> bool:
+        return (
+            3 <= num_vertices <= self.MAX_VERTICES
+            and num_loops == num_vertices and num_edges == 2 * num_vertices
+        )
+
+    def evaluate(self, edges: List[Tuple[int, int]]) -> Optional[int]:
+        profile = DegreeProfile(edges)
+        if any(num_loops != 1 for num_loops in profile.loops.values()):
+            return None
+        if any(len(n) != 2 for n in profile.neighbors.values()):
+            return None
+        if not profile.is_connected():
+            return None
+        n = len(profile.neighbors)
+        if n < 8:
+            return {3: -3, 4: 2, 5: -1, 6: 2, 7: -3}[n]
+        return 0 if n % 2 == 0 else -1
+
+DEFAULT_EVALUATORS: List[Evaluator] = [
+    CycleWithLeaves(),
+    LoopsOnly(),
+    HangingStar(),
+    BalloonPath(),
+    BalloonCycle(),
+]
+
+def evaluate(
+    evaluators: List[Evaluator], num_edges: int, num_vertices: int,
+    num_loops: int, get_edges: Callable[[], List[Tuple[int, int]]]
+) -> Optional[int]:
+    """Score a position with the first evaluator that recognises it.
+
+    The edge list is only built once some evaluator's count test passes.
+    """
+    edges = None
+    for evaluator in evaluators:
+        if evaluator.applies(num_edges, num_vertices, num_loops):
+            if edges is None:
+                edges = get_edges()
+            value = evaluator.evaluate(edges)
+            if value is not None:
+                return value
+    return None
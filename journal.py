@@ -0,0 +1,95 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import os
+import time
+from transposition import TableEntry, EXACT, LOWER, UPPER
+
+Move = Tuple[int, int]
+
+class RootResult(NamedTuple):
+    outcome: int
+    bound: str
+
+class Journal:
+    """Append-only log of a solve in progress, for resuming after a crash.
+
+    Each memo entry the search settles is appended as a `P` line, and the
+    outcome of each finished root move as an `R` line tagged with the root
+    key. Lines are buffered and flushed to disk every `flush_secs` seconds;
+    root results are flushed as soon as they are written. A line cut short
+    by a crash is skipped when the journal is read back.
+    """
+
+    def __init__(self, path: str, flush_secs: float = 30.0) -> None:
+        self.path = path
+        self.flush_secs = flush_secs
+        self._file = open(path, 'a')
+        self._last_flush = time.perf_counter()
+
+    def record_entry(self, key: bytes, entry: TableEntry) -> None:
+        self._file.write(
+            f'P,{key.hex()},{entry.value},{entry.bound},{entry.depth},' +
+            f'{_move_str(entry.best_move)}\n'
+        )
+        if time.perf_counter() - self._last_flush >= self.flush_secs:
+            self.flush()
+
+    def record_root_move(self,
+        root_key: bytes, move: Move, outcome: int, alpha: int, beta: int
+    ) -> None:
+        if outcome <= alpha:
+            bound = UPPER
+        elif outcome >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self._file.write(
+            f'R,{root_key.hex()},{_move_str(move)},{outcome},{bound}\n'
+        )
+        self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_flush = time.perf_counter()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+def read_journal(
+    path: str, root_key: bytes
+) -> Tuple[List[Tuple[bytes, TableEntry]], Dict[Move, RootResult]]:
+    """Memo entries and, for the given root, finished root move results."""
+    entries: List[Tuple[bytes, TableEntry]] = []
+    root_results: Dict[Move, RootResult] = {}
+    if not os.path.exists(path):
+        return (entries, root_results)
+    root_hex = root_key.hex()
+    with open(path, 'r') as file:
+        for line in file:
+            if not line.endswith('\n'):
+                break
+            items = line.rstrip('\n').split(',')
+            try:
+                if items[0] == 'P' and len(items) == 6:
+                    entries.append((bytes.fromhex(items[1]), TableEntry(
+                        int(items[2]), items[3], int(items[4]),
+                        _move_for_str(items[5])
+                    )))
+                elif items[0] == 'R' and len(items) == 5:
+                    if items[1] == root_hex:
+                        root_results[_move_for_str(items[2])] = RootResult(
+                            int(items[3]), items[4]
+                        )
+            except ValueError:
+                continue
+    return (entries, root_results)
+
+def _move_str(move: Optional[Move]) -> str:
+    return '' if move is None else f'{move[0]}-{move[1]}'
+
+def _move_for_str(move_str: str) -> Optional[Move]:
+    if not move_str:
+        return None
+    v0, v1 = move_str.split('-')
+    return (int(v0), int(v1))
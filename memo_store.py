@@ -0,0 +1,62 @@
+from typing import Iterable, Iterator, Optional, Tuple
+import sqlite3
+from transposition import TableEntry
+
+class MemoStore:
+    """Memo entries kept on disk in an sqlite3 database.
+
+    Rows are keyed by packed position key (see `transposition.pack_key`), so
+    opening a store costs the same however many positions it holds, and
+    each lookup is one indexed read. Writes go in batches, one transaction
+    per `put_many`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=60.0)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS memo ('
+            'key BLOB PRIMARY KEY, value INTEGER NOT NULL, '
+            'bound TEXT NOT NULL, depth INTEGER NOT NULL, '
+            'move0 INTEGER, move1 INTEGER) WITHOUT ROWID'
+        )
+        self._connection.commit()
+
+    def is_empty(self) -> bool:
+        return self._connection.execute(
+            'SELECT 1 FROM memo LIMIT 1'
+        ).fetchone() is None
+
+    def get(self, key: bytes) -> Optional[TableEntry]:
+        row = self._connection.execute(
+            'SELECT value, bound, depth, move0, move1 FROM memo WHERE key = ?',
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._entry_for_row(row)
+
+    def items(self) -> Iterator[Tuple[bytes, TableEntry]]:
+        for row in self._connection.execute(
+            'SELECT key, value, bound, depth, move0, move1 FROM memo'
+        ):
+            yield (row[0], self._entry_for_row(row[1:]))
+
+    def put_many(self, items: Iterable[Tuple[bytes, TableEntry]]) -> None:
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                (key, entry.value, entry.bound, entry.depth) +
+                (entry.best_move or (None, None))
+                for key, entry in items
+            )
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _entry_for_row(self, row: Tuple) -> TableEntry:
+        value, bound, depth, move0, move1 = row
+        best_move = None if move0 is None else (move0, move1)
+        return TableEntry(value, bound, depth, best_move)
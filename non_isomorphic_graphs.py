@@ -1,66 +1,226 @@
-import networkx as nx
-from networkx.algorithms import weisfeiler_lehman_graph_hash
-from itertools import combinations
+from typing import Dict, Iterator, List, Set, Tuple
+import argparse
+import sys
+import time
+from canonical_labeling import CanonicalLabeling
+from transposition import pack_key
 
-def generate_subgraphs_optimized(n, k):
-    if k == 0:
-        return [nx.complete_graph(n)]
-    if k >= n * (n - 1) // 2:
-        return [nx.Graph()]
+def non_isomorphic_edge_deletions(
+    n: int, k: int
+) -> Iterator[List[Tuple[int, int]]]:
+    """Every way to delete `k` edges from K_n, once per isomorphism class.
 
-    G = nx.complete_graph(n)
-    initial_edges_removed = [(0, 1)]  # Store initially removed edge
+    Deleting edges from K_n is choosing a graph of deleted edges on at
+    most `n` vertices, and two deletions leave isomorphic graphs exactly
+    when the deleted edges do, so the classes are enumerated as graphs with
+    `k` edges (or, past half of K_n, as the graphs of kept edges instead,
+    which is shallower). Yields the kept edges, on vertices 0 to n - 1.
+    """
+    num_pairs = n * (n - 1) // 2
+    if not 0 <= k <= num_pairs:
+        return
+    if 2 * k > num_pairs:
+        yield from non_isomorphic_graphs(n, num_pairs - k)
+        return
+    for removed_edges in non_isomorphic_graphs(n, k):
+        removed = set(removed_edges)
+        yield [
+            (v0, v1) for v0 in range(n) for v1 in range(v0 + 1, n)
+            if (v0, v1) not in removed
+        ]
 
-    unique_subgraphs = []
+def non_isomorphic_graphs(
+    max_vertices: int, num_edges: int
+) -> Iterator[List[Tuple[int, int]]]:
+    """Every simple graph with `num_edges` edges, without isolated vertices
+    and with at most `max_vertices` vertices, once per isomorphism class.
 
-    if k > 0:
-        # Case 1: Second edge adjacent to the first
-        G1 = G.copy()
-        G1.remove_edge(1, 2)
-        unique_subgraphs.extend(generate_subgraphs_recursive(G1, k - 1, initial_edges_removed + [(1, 2)]))
+    Graphs are grown an edge at a time by canonical augmentation (McKay's
+    canonical construction path): a child is kept only when deleting its
+    canonical last edge, the edge that comes last in its
+    `CanonicalLabeling`, leaves the parent it was grown from, and the
+    children of one parent are deduplicated by their canonical keys. Every
+    class then has exactly one parent class and comes from it once, so
+    nothing is kept beyond the path being extended and its siblings, and
+    the work done is a few canonical labelings per class rather than one
+    per edge subset.
+    """
+    if num_edges == 0:
+        yield []
+        return
+    empty: List[Tuple[int, int]] = []
+    stack = [iter(_children(empty, pack_key(empty), max_vertices))]
+    path_length = 1
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            path_length -= 1
+            continue
+        edges, key = child
+        if path_length == num_edges:
+            yield edges
+            continue
+        stack.append(iter(_children(edges, key, max_vertices)))
+        path_length += 1
 
-        # Case 2: Second edge not adjacent to the first
-        G2 = G.copy()
-        G2.remove_edge(2, 3) 
-        unique_subgraphs.extend(generate_subgraphs_recursive(G2, k - 1, initial_edges_removed + [(2, 3)]))
-    else:
-        unique_subgraphs.append((G, initial_edges_removed)) # Return graph and removed edges
-
-    return get_non_isomorphic_graphs(unique_subgraphs)
+def _children(
+    edges: List[Tuple[int, int]], key: bytes, max_vertices: int
+) -> Iterator[Tuple[List[Tuple[int, int]], bytes]]:
+    # `edges` has no isolated vertices and its vertices are 0 to
+    # num_vertices - 1, so the next unused vertex is num_vertices.
+    num_vertices = 1 + max((v for e in edges for v in e), default=-1)
+    candidates = _candidate_edges(edges, num_vertices, max_vertices)
+    child_keys: Set[bytes] = set()
+    for e in candidates:
+        child_edges = sorted(edges + [e])
+        labeling = CanonicalLabeling(child_edges)
+        canonical_edges = labeling.calc()
+        child_key = pack_key(canonical_edges)
+        if child_key in child_keys:
+            continue
+        if not _is_canonical_child(
+            child_edges, labeling, canonical_edges[-1], e, key
+        ):
+            continue
+        child_keys.add(child_key)
+        yield (child_edges, child_key)
 
-def generate_subgraphs_recursive(G, k, removed_edges):
-    unique_subgraphs = {}
-    edges_to_remove = list(combinations(G.edges(), k))
+def _candidate_edges(
+    edges: List[Tuple[int, int]], num_vertices: int, max_vertices: int
+) -> List[Tuple[int, int]]:
+    # One edge per orbit of the pairs that aren't edges yet, under the
+    # automorphisms the labeling found. Those may be fewer than the whole
+    # group, which only leaves some candidates interchangeable; the
+    # children's keys catch those.
+    parent: Dict[Tuple[int, int], Tuple[int, int]] = {}
 
-    for edges in edges_to_remove:
-        subgraph = G.copy()
-        subgraph.remove_edges_from(edges)
-        wl_hash = weisfeiler_lehman_graph_hash(subgraph)
+    def find(pair: Tuple[int, int]) -> Tuple[int, int]:
+        while parent[pair] != pair:
+            parent[pair] = parent[parent[pair]]
+            pair = parent[pair]
+        return pair
 
-        if wl_hash not in unique_subgraphs:
-            unique_subgraphs[wl_hash] = (subgraph, removed_edges + list(edges)) 
+    existing = set(edges)
+    for v0 in range(num_vertices):
+        for v1 in range(v0 + 1, num_vertices):
+            if (v0, v1) not in existing:
+                parent[(v0, v1)] = (v0, v1)
+    if num_vertices < max_vertices:
+        # The edge to a new vertex only depends on the old vertex's orbit.
+        for v in range(num_vertices):
+            parent[(v, num_vertices)] = (v, num_vertices)
+    if edges:
+        labeling = CanonicalLabeling(edges)
+        labeling.calc()
+        for g in labeling.automorphisms:
+            for v0, v1 in list(parent):
+                w0 = g[v0]
+                w1 = g[v1] if v1 < num_vertices else num_vertices
+                image = (min(w0, w1), max(w0, w1))
+                root, image_root = find((v0, v1)), find(image)
+                if root != image_root:
+                    parent[max(root, image_root)] = min(root, image_root)
+    candidates = [pair for pair in parent if find(pair) == pair]
+    if num_vertices + 2 <= max_vertices:
+        candidates.append((num_vertices, num_vertices + 1))
+    return candidates
 
-    return list(unique_subgraphs.values())
+def _is_canonical_child(
+    edges: List[Tuple[int, int]], labeling: CanonicalLabeling,
+    last_canonical_edge: Tuple[int, int], added_edge: Tuple[int, int],
+    parent_key: bytes
+) -> bool:
+    # Whether deleting the child's canonical last edge leaves a graph
+    # isomorphic to the parent it was grown from.
+    raw_id_for_canonical_id = {
+        i: raw_id for raw_id, i in labeling.canonical_ids.items()
+    }
+    c0, c1 = last_canonical_edge
+    v0, v1 = raw_id_for_canonical_id[c0], raw_id_for_canonical_id[c1]
+    last_edge = (min(v0, v1), max(v0, v1))
+    if last_edge == added_edge:
+        return True
+    return pack_key(CanonicalLabeling(
+        [e for e in edges if e != last_edge]
+    ).calc()) == parent_key
 
-def get_non_isomorphic_graphs(graphs):
-    non_isomorphic = []
-    hashes = set()
-    for graph, removed_edges in graphs:
-        h = weisfeiler_lehman_graph_hash(graph)
-        if h not in hashes:
-            non_isomorphic.append((graph, removed_edges))
-            hashes.add(h)
-    return non_isomorphic
+def to_graph6(num_vertices: int, edges: List[Tuple[int, int]]) -> str:
+    """The graph6 string of a simple graph on vertices 0 to n - 1."""
+    if num_vertices < 63:
+        text = [chr(num_vertices + 63)]
+    else:
+        text = ['~'] + [
+            chr((num_vertices >> shift & 63) + 63) for shift in (12, 6, 0)
+        ]
+    existing = {(min(e), max(e)) for e in edges}
+    bits = [
+        (v0, v1) in existing
+        for v1 in range(1, num_vertices) for v0 in range(v1)
+    ]
+    bits.extend([False] * (-len(bits) % 6))
+    for i in range(0, len(bits), 6):
+        value = 0
+        for bit in bits[i:i + 6]:
+            value = value << 1 | bit
+        text.append(chr(value + 63))
+    return ''.join(text)
 
-# Test the program
-n = 11  
-k = 6
+def from_graph6(text: str) -> Tuple[int, List[Tuple[int, int]]]:
+    """The number of vertices and the edges of a graph6 string."""
+    data = [ord(c) - 63 for c in text.strip()]
+    if data[0] == 63:
+        num_vertices = data[1] << 12 | data[2] << 6 | data[3]
+        data = data[4:]
+    else:
+        num_vertices = data[0]
+        data = data[1:]
+    edges: List[Tuple[int, int]] = []
+    i = 0
+    for v1 in range(1, num_vertices):
+        for v0 in range(v1):
+            if data[i // 6] >> (5 - i % 6) & 1:
+                edges.append((v0, v1))
+            i += 1
+    return (num_vertices, edges)
 
-unique_subgraphs = generate_subgraphs_optimized(n, k)
+def main():
+    parser = argparse.ArgumentParser(
+        description='List the non-isomorphic graphs left by deleting ' +
+        'edges from a complete graph, one graph6 line each.'
+    )
+    parser.add_argument(
+        '--n',
+        default=11,
+        type=int,
+        help='Vertices in the complete graph (defaults to 11).'
+    )
+    parser.add_argument(
+        '--k',
+        default=6,
+        type=int,
+        help='Edges to delete (defaults to 6).'
+    )
+    parser.add_argument(
+        '--file',
+        default=None,
+        type=str,
+        help='File to write the graphs to (defaults to standard output).'
+    )
+    args = parser.parse_args()
+    out = sys.stdout if args.file is None else open(args.file, 'w')
+    start_time = time.perf_counter()
+    count = 0
+    for edges in non_isomorphic_edge_deletions(args.n, args.k):
+        out.write(to_graph6(args.n, edges) + '\n')
+        count += 1
+    if out is not sys.stdout:
+        out.close()
+    print(
+        f'{count} non-isomorphic graphs from K_{args.n} with {args.k} ' +
+        f'edges deleted in {time.perf_counter() - start_time:.2f} seconds',
+        file=sys.stderr
+    )
 
-print(f"Unique non-isomorphic subgraphs of K_{n} with {k} edges removed:\n")
-for i, (subgraph, removed_edges) in enumerate(unique_subgraphs):
-    print(f"Subgraph {i + 1}:")
-    print("   Removed Edges:", removed_edges)
-    print("   Edge List:", subgraph.edges())
-    print("-" * 20)
\ No newline at end of file
+if __name__ == '__main__':
+    main()
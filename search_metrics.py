@@ -0,0 +1,95 @@
+from typing import Any, Dict, List
+import json
+import time
+
+class SearchMetrics:
+    """Counters and timings for one search, sampled at a fixed interval.
+
+    A `GameRunner` given one counts nodes per depth, times `CanonicalEdges`
+    (components labeled for the first time) and move generation, and
+    every 1024 nodes checks whether `interval` seconds have passed since
+    the last sample; if so it calls `sample`, which records nodes per
+    second, memo probes and hits and the memo's size. A runner without
+    one only tests for None at each of those points.
+    """
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        self.start_time = time.perf_counter()
+        self.next_sample_time = self.start_time + interval
+        self.nodes_by_depth: List[int] = []
+        self.canonicalize_seconds = 0.0
+        self.move_seconds = 0.0
+        self.num_canonicalized = 0
+        self.peak_memo_entries = 0
+        self.samples: List[Dict[str, Any]] = []
+        self._last_time = self.start_time
+        self._last_nodes = 0
+
+    def count_node(self, depth: int) -> None:
+        while len(self.nodes_by_depth) <= depth:
+            self.nodes_by_depth.append(0)
+        self.nodes_by_depth[depth] += 1
+
+    def sample(self, num_nodes: int, memo) -> Dict[str, Any]:
+        now = time.perf_counter()
+        elapsed = now - self._last_time
+        # The memo counts its own peak as it inserts, which catches growth
+        # evicted again between samples; a shared table never shrinks, so
+        # its size at each sample is its peak so far.
+        self.peak_memo_entries = max(
+            self.peak_memo_entries, memo.peak_entries, len(memo)
+        )
+        sample = {
+            'seconds': round(now - self.start_time, 3),
+            'nodes': num_nodes,
+            'nodes_per_second': round(
+                (num_nodes - self._last_nodes) / elapsed if elapsed else 0.0
+            ),
+            'memo_probes': memo.num_probes,
+            'memo_hits': memo.num_hits,
+            'memo_entries': len(memo),
+            'canonicalize_seconds': round(self.canonicalize_seconds, 3),
+            'move_seconds': round(self.move_seconds, 3),
+        }
+        self.samples.append(sample)
+        self._last_time = now
+        self._last_nodes = num_nodes
+        self.next_sample_time = now + self.interval
+        return sample
+
+    def as_dict(self, num_nodes: int, memo) -> Dict[str, Any]:
+        """Totals for the search so far, with every sample taken."""
+        final = self.sample(num_nodes, memo)
+        seconds = final['seconds']
+        return {
+            'seconds': seconds,
+            'nodes': num_nodes,
+            'nodes_per_second': round(num_nodes / seconds if seconds else 0.0),
+            'memo_probes': memo.num_probes,
+            'memo_hits': memo.num_hits,
+            'memo_misses': memo.num_probes - memo.num_hits,
+            'peak_memo_entries': self.peak_memo_entries,
+            'components_canonicalized': self.num_canonicalized,
+            'canonicalize_seconds': round(self.canonicalize_seconds, 3),
+            'move_seconds': round(self.move_seconds, 3),
+            'nodes_by_depth': self.nodes_by_depth,
+            'samples': self.samples,
+        }
+
+    def write(self, path: str, num_nodes: int, memo) -> None:
+        with open(path, 'w') as file:
+            json.dump(self.as_dict(num_nodes, memo), file, indent=2)
+            file.write('\n')
+
+def progress_line(sample: Dict[str, Any]) -> str:
+    """One line of progress from a sample."""
+    rate = (
+        sample['memo_hits'] / sample['memo_probes']
+        if sample['memo_probes'] else 0.0
+    )
+    return (
+        f'seconds:{sample["seconds"]:.2f} nodes:{sample["nodes"]} ' +
+        f'nodes/s:{sample["nodes_per_second"]} ' +
+        f'memo hits:{rate:.1%} entries:{sample["memo_entries"]}'
+    )
@@ -0,0 +1,124 @@
+from typing import Optional
+from multiprocessing import shared_memory
+import hashlib
+import struct
+from transposition import TranspositionTable, TableEntry, EXACT, LOWER, UPPER
+
+# check, key digest (high half), packed entry
+_SLOT = struct.Struct('<QQQ')
+BUCKET_SIZE = 4
+_BOUND_CODES = {EXACT: 1, LOWER: 2, UPPER: 3}
+_BOUNDS = {code: bound for bound, code in _BOUND_CODES.items()}
+# Packed entry: value (16 bits), bound (2), whether there's a best move (1),
+# depth (16) and the best move's two canonical vertex ids (14 each).
+_DEPTH_SHIFT = 19
+_MOVE_SHIFT = 35
+_HAS_MOVE = 1 << 18
+_MAX_VERTEX = (1 << 14) - 1
+
+class SharedTranspositionTable(TranspositionTable):
+    """A fixed-size transposition table in `multiprocessing.shared_memory`.
+
+    Every process that attaches by `name` sees the others' entries, so one
+    worker's results prune the rest. Keys are stored as 128-bit digests, in
+    buckets of `BUCKET_SIZE` slots; a full bucket gives up its shallowest
+    entry. There are no locks: each slot stores its entry, half the digest
+    and the other half XORed with the entry, so a slot torn by two writers
+    racing fails the check and reads as a miss.
+    """
+
+    def __init__(self,
+        num_slots: int = 1 << 20, name: Optional[str] = None
+    ) -> None:
+        super().__init__()
+        self.num_slots = max(BUCKET_SIZE, num_slots - num_slots % BUCKET_SIZE)
+        self._num_buckets = self.num_slots // BUCKET_SIZE
+        self._is_owner = name is None
+        if name is None:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=self.num_slots * _SLOT.size
+            )
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self._buffer = self._shm.buf
+
+    def __len__(self) -> int:
+        return sum(
+            1 for slot in range(self.num_slots)
+            if _SLOT.unpack_from(self._buffer, slot * _SLOT.size)[2]
+        )
+
+    def get(self, key: bytes) -> Optional[TableEntry]:
+        low, high, offset = self._locate(key)
+        for slot_offset in range(
+            offset, offset + BUCKET_SIZE * _SLOT.size, _SLOT.size
+        ):
+            check, slot_high, data = _SLOT.unpack_from(
+                self._buffer, slot_offset
+            )
+            if data and slot_high == high and check ^ data == low:
+                return self._unpack_entry(data)
+        return None
+
+    def put(self, key: bytes, entry: TableEntry) -> None:
+        low, high, offset = self._locate(key)
+        data = self._pack_entry(entry)
+        target = None
+        target_depth = None
+        for slot_offset in range(
+            offset, offset + BUCKET_SIZE * _SLOT.size, _SLOT.size
+        ):
+            check, slot_high, slot_data = _SLOT.unpack_from(
+                self._buffer, slot_offset
+            )
+            if not slot_data or slot_high == high and check ^ slot_data == low:
+                target = slot_offset
+                break
+            depth = slot_data >> _DEPTH_SHIFT & 0xFFFF
+            if target is None or depth < target_depth:
+                target = slot_offset
+                target_depth = depth
+        _SLOT.pack_into(self._buffer, target, low ^ data, high, data)
+
+    def close(self) -> None:
+        self._buffer.release()
+        self._shm.close()
+        if self._is_owner:
+            self._shm.unlink()
+
+    def _locate(self, key: bytes):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        low = int.from_bytes(digest[:8], 'little')
+        high = int.from_bytes(digest[8:], 'little')
+        bucket = low % self._num_buckets
+        return (low, high, bucket * BUCKET_SIZE * _SLOT.size)
+
+    def _pack_entry(self, entry: TableEntry) -> int:
+        data = (
+            (entry.value & 0xFFFF) | _BOUND_CODES[entry.bound] << 16
+            | min(entry.depth, 0xFFFF) << _DEPTH_SHIFT
+        )
+        # The best move only orders the next search of this position, so a
+        # move too wide to store is dropped rather than failing the store.
+        if entry.best_move is not None and max(entry.best_move) <= _MAX_VERTEX:
+            move0, move1 = entry.best_move
+            data |= (
+                _HAS_MOVE | move0 << _MOVE_SHIFT | move1 << _MOVE_SHIFT + 14
+            )
+        return data
+
+    def _unpack_entry(self, data: int) -> TableEntry:
+        value = data & 0xFFFF
+        if value >= 0x8000:
+            value -= 0x10000
+        best_move = None
+        if data & _HAS_MOVE:
+            best_move = (
+                data >> _MOVE_SHIFT & _MAX_VERTEX,
+                data >> _MOVE_SHIFT + 14 & _MAX_VERTEX
+            )
+        return TableEntry(
+            value, _BOUNDS[data >> 16 & 0x3], data >> _DEPTH_SHIFT & 0xFFFF,
+            best_move
+        )
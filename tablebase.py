@@ -0,0 +1,236 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+import argparse
+import mmap
+import os
+import struct
+import time
+from canonical_labeling import CanonicalLabeling
+from transposition import pack_key
+
+_MAGIC = b'MDTB'
+# magic, max vertices, max edges, max loops per vertex, key size, count
+_HEADER = struct.Struct('<4sBBBBI')
+
+def canonical_key(edges: List[Tuple[Hashable, Hashable]]) -> bytes:
+    """A true canonical key for a position, built component by component.
+
+    Each component is labeled by `CanonicalLabeling` and the components are
+    laid out in order of their keys, as `algorithm_MD.GameGraph.key` does
+    with the 'ir' canonicalizer, so the two keys agree.
+    """
+    parent: Dict[Hashable, Hashable] = {}
+
+    def find(v: Hashable) -> Hashable:
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    for v0, v1 in edges:
+        parent.setdefault(v0, v0)
+        parent.setdefault(v1, v1)
+        root0, root1 = find(v0), find(v1)
+        if root0 != root1:
+            parent[root0] = root1
+    edges_for_root: Dict[Hashable, List[Tuple[Hashable, Hashable]]] = {}
+    for e in edges:
+        edges_for_root.setdefault(find(e[0]), []).append(e)
+    components = []
+    for component_edges in edges_for_root.values():
+        labeling = CanonicalLabeling(component_edges)
+        canonical_edges = labeling.calc()
+        components.append((
+            pack_key(canonical_edges), canonical_edges,
+            len(labeling.canonical_ids)
+        ))
+    components.sort()
+    position_edges: List[Tuple[int, int]] = []
+    offset = 0
+    for _, canonical_edges, num_vertices in components:
+        position_edges.extend(
+            (v0 + offset, v1 + offset) for v0, v1 in canonical_edges
+        )
+        offset += num_vertices
+    return pack_key(position_edges)
+
+class Tablebase:
+    """Net scores of every small position, memory-mapped read-only.
+
+    The file, written by `build_tablebase`, holds every position with up
+    to `max_vertices` vertices, `max_edges` edges and `max_loops` loops on
+    any vertex, with no repeated edges between two vertices. Records are
+    the position's `canonical_key` padded to a fixed size, its length and
+    the net score for the player to move, sorted so a lookup is a binary
+    search over the mapped pages. Opening the file reads only its header,
+    and processes that open the same file share its pages.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(
+            self._file.fileno(), 0, access=mmap.ACCESS_READ
+        )
+        (
+            magic, self.max_vertices, self.max_edges, self.max_loops,
+            self._key_size, self._count
+        ) = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            raise ValueError(f'Not a tablebase file: {path}')
+        self._record_size = self._key_size + 2
+
+    def __len__(self) -> int:
+        return self._count
+
+    def covers(self, num_vertices: int, num_edges: int) -> bool:
+        return (
+            num_vertices <= self.max_vertices and num_edges <= self.max_edges
+        )
+
+    def get(self, edges: List[Tuple[Hashable, Hashable]]) -> Optional[int]:
+        return self.get_key(canonical_key(edges))
+
+    def get_key(self, key: bytes) -> Optional[int]:
+        """The net score for a `canonical_key`, or None if it isn't held."""
+        if len(key) > self._key_size:
+            return None
+        target = key.ljust(self._key_size, b'\0') + bytes((len(key),))
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _HEADER.size + mid * self._record_size
+            record = self._map[offset:offset + self._key_size + 1]
+            if record < target:
+                lo = mid + 1
+            elif record > target:
+                hi = mid
+            else:
+                return struct.unpack_from(
+                    '<b', self._map, offset + self._key_size + 1
+                )[0]
+        return None
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+def open_tablebase(path: str) -> Optional[Tablebase]:
+    """The tablebase at `path`, or None if there is no file there."""
+    if not os.path.exists(path):
+        return None
+    return Tablebase(path)
+
+def build_tablebase(
+    path: str, max_vertices: int = 7, max_edges: int = 10, max_loops: int = 2
+) -> int:
+    """Enumerate and solve every small position, and write the tablebase.
+
+    Positions are built an edge at a time, every way of adding an edge to
+    every position one edge smaller, and deduplicated by `canonical_key`.
+    Each is then solved from its children, which are one edge smaller and
+    so already solved. Returns the number of positions written.
+    """
+    values: Dict[bytes, int] = {pack_key([]): 0}
+    level: Dict[bytes, List[Tuple[int, int]]] = {pack_key([]): []}
+    for _ in range(max_edges):
+        next_level: Dict[bytes, List[Tuple[int, int]]] = {}
+        for edges in level.values():
+            for edge in _added_edges(edges, max_vertices, max_loops):
+                new_edges = sorted(edges + [edge])
+                key = canonical_key(new_edges)
+                if key not in next_level:
+                    next_level[key] = new_edges
+        for key, edges in next_level.items():
+            values[key] = _solve(edges, values)
+        level = next_level
+    del values[pack_key([])]
+    key_size = max(len(key) for key in values)
+    records = sorted(
+        key.ljust(key_size, b'\0') + bytes((len(key),))
+        + struct.pack('<b', value)
+        for key, value in values.items()
+    )
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(
+            _MAGIC, max_vertices, max_edges, max_loops, key_size, len(records)
+        ))
+        file.writelines(records)
+    return len(records)
+
+def _added_edges(
+    edges: List[Tuple[int, int]], max_vertices: int, max_loops: int
+) -> List[Tuple[int, int]]:
+    # Edges between or on existing vertices, to one new vertex, or between
+    # two new ones. Positions have no isolated vertices.
+    num_vertices = 1 + max((max(e) for e in edges), default=-1)
+    existing = set(edges)
+    num_loops: Dict[int, int] = {}
+    for v0, v1 in edges:
+        if v0 == v1:
+            num_loops[v0] = num_loops.get(v0, 0) + 1
+    last = num_vertices if num_vertices < max_vertices else num_vertices - 1
+    added: List[Tuple[int, int]] = []
+    for v0 in range(last + 1):
+        if num_loops.get(v0, 0) < max_loops:
+            added.append((v0, v0))
+        for v1 in range(v0 + 1, last + 1):
+            if (v0, v1) not in existing:
+                added.append((v0, v1))
+    if num_vertices + 2 <= max_vertices:
+        added.append((num_vertices, num_vertices + 1))
+    return added
+
+def _solve(edges: List[Tuple[int, int]], values: Dict[bytes, int]) -> int:
+    # A capture keeps the turn; any other move hands it over.
+    best_outcome = None
+    for edge in set(edges):
+        child = list(edges)
+        child.remove(edge)
+        remaining = {v for e in child for v in e}
+        points = len({v for v in edge if v not in remaining})
+        value = values[canonical_key(child)]
+        outcome = points + value if points > 0 else -1 * value
+        if best_outcome is None or outcome > best_outcome:
+            best_outcome = outcome
+    return best_outcome
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build the endgame tablebase of small positions.'
+    )
+    parser.add_argument(
+        '--max_vertices',
+        default=7,
+        type=int,
+        help='Most vertices in a position (defaults to 7).'
+    )
+    parser.add_argument(
+        '--max_edges',
+        default=10,
+        type=int,
+        help='Most edges in a position, loops included (defaults to 10).'
+    )
+    parser.add_argument(
+        '--max_loops',
+        default=2,
+        type=int,
+        help='Most loops on one vertex (defaults to 2).'
+    )
+    parser.add_argument(
+        '--file',
+        default='tablebase.bin',
+        type=str,
+        help='File to write the tablebase to (defaults to "tablebase.bin").'
+    )
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    count = build_tablebase(
+        args.file, args.max_vertices, args.max_edges, args.max_loops
+    )
+    print(
+        f'wrote {count} positions to {args.file} in ' +
+        f'{time.perf_counter() - start_time:.1f} seconds'
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+from typing import List, Tuple
+import pytest
+from algorithm_MD import GameRunner
+from evaluators import (
+    DEFAULT_EVALUATORS, BalloonCycle, BalloonPath, DegreeProfile, evaluate
+)
+
+# Instances this size or smaller are re-solved by full search; the balloon
+# margins up to the evaluators' caps were checked the same way, which takes
+# minutes.
+SIZE = 8
+
+def _cases(size: int) -> List[Tuple[str, List[Tuple[int, int]]]]:
+    cases: List[Tuple[str, List[Tuple[int, int]]]] = []
+    for c in range(2, size + 1):
+        cycle = [(i, (i + 1) % c) for i in range(c)]
+        for num_leaves in range(0, size - c + 1):
+            leaves = [(i % c, c + i) for i in range(num_leaves)]
+            cases.append((f'cycle {c} + {num_leaves} leaves', cycle + leaves))
+    for num_vertices in range(1, 4):
+        for num_loops in range(1, size):
+            cases.append((
+                f'{num_vertices} vertices with {num_loops}+ loops',
+                [(v, v) for v in range(num_vertices)
+                 for _ in range(num_loops + v % 2)]
+            ))
+    for n in range(1, size):
+        for k in range(1, 4):
+            star = [(0, i) for i in range(1, n + 1)]
+            loops = [(i, i) for i in range(1, n + 1) for _ in range(k)]
+            cases.append((f'hanging star {n}x{k}', star + loops))
+    for n in range(2, size + 1):
+        cases.append((f'balloon path {n}', _balloon_path(n)))
+        if n >= 3:
+            cases.append((f'balloon cycle {n}', _balloon_cycle(n)))
+    return cases
+
+def _balloon_path(n: int) -> List[Tuple[int, int]]:
+    return [(i, i + 1) for i in range(n - 1)] + [(i, i) for i in range(n)]
+
+def _balloon_cycle(n: int) -> List[Tuple[int, int]]:
+    return _balloon_path(n) + [(0, n - 1)]
+
+def _evaluate(edges: List[Tuple[int, int]]):
+    profile = DegreeProfile(edges)
+    return evaluate(
+        DEFAULT_EVALUATORS, len(edges), len(profile.neighbors),
+        sum(profile.loops.values()), lambda: edges
+    )
+
+@pytest.mark.parametrize(
+    'edges', [edges for _, edges in _cases(SIZE)],
+    ids=[name for name, _ in _cases(SIZE)]
+)
+def test_evaluators_match_search(edges):
+    value = _evaluate(edges)
+    if value is None:
+        pytest.skip('no evaluator recognises this instance')
+    expected = GameRunner(
+        edges, evaluators=[], show_progress=False, use_tablebase=False
+    ).solve()
+    assert value == expected
+
+def test_balloons_past_their_caps_are_left_to_search():
+    assert _evaluate(_balloon_path(BalloonPath.MAX_VERTICES)) is not None
+    assert _evaluate(_balloon_path(BalloonPath.MAX_VERTICES + 1)) is None
+    assert _evaluate(_balloon_cycle(BalloonCycle.MAX_VERTICES)) is not None
+    assert _evaluate(_balloon_cycle(BalloonCycle.MAX_VERTICES + 1)) is None
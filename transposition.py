@@ -0,0 +1,283 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+import struct
+import sys
+
+EXACT = 'E'
+LOWER = 'L'
+UPPER = 'U'
+
+Move = Tuple[int, int]
+
+# Rough cost of one entry beyond its key: the dict slot and the TableEntry.
+_ENTRY_OVERHEAD_BYTES = 160
+
+# A key whose first byte is this holds a 16-bit vertex count and a plain
+# list of 16-bit edges instead, for positions too large for the bitset.
+_WIDE_KEY = 0xFF
+
+def pack_key(edges: List[Tuple[int, int]]) -> bytes:
+    """Pack a canonical edge list into a compact memo key.
+
+    The key is the vertex count, then a bitset over the upper triangle of
+    the adjacency matrix, then one (v0, v1) byte pair for every loop and
+    every repeat of an edge already in the bitset. Positions with 255 or
+    more vertices are packed as `_WIDE_KEY`, a two-byte vertex count and
+    every edge as a pair of two-byte ids; those are sparse enough that the
+    list is smaller than the bitset would be anyway.
+    """
+    num_vertices = 1 + max((max(e) for e in edges), default=-1)
+    if num_vertices >= _WIDE_KEY:
+        return bytes((_WIDE_KEY,)) + struct.pack(
+            f'<{1 + 2 * len(edges)}H', num_vertices,
+            *(v for e in sorted(tuple(sorted(e)) for e in edges) for v in e)
+        )
+    bits = 0
+    extras: List[int] = []
+    for v0, v1 in sorted(tuple(sorted(e)) for e in edges):
+        if v0 == v1:
+            extras.extend((v0, v1))
+            continue
+        bit = 1 << (v0 * (2 * num_vertices - v0 - 1) // 2 + v1 - v0 - 1)
+        if bits & bit:
+            extras.extend((v0, v1))
+        bits |= bit
+    num_bits = num_vertices * (num_vertices - 1) // 2
+    return (
+        bytes((num_vertices,)) + bits.to_bytes((num_bits + 7) // 8, 'little')
+        + bytes(extras)
+    )
+
+def unpack_key(key: bytes) -> List[Tuple[int, int]]:
+    """The sorted edge list that `pack_key` packed into `key`."""
+    if key[0] == _WIDE_KEY:
+        ids = struct.unpack(f'<{(len(key) - 1) // 2}H', key[1:])[1:]
+        return [(ids[i], ids[i + 1]) for i in range(0, len(ids), 2)]
+    num_vertices = key[0]
+    num_bits = num_vertices * (num_vertices - 1) // 2
+    num_bit_bytes = (num_bits + 7) // 8
+    bits = int.from_bytes(key[1:1 + num_bit_bytes], 'little')
+    edges: List[Tuple[int, int]] = []
+    bit = 1
+    for v0 in range(num_vertices):
+        for v1 in range(v0 + 1, num_vertices):
+            if bits & bit:
+                edges.append((v0, v1))
+            bit <<= 1
+    extras = key[1 + num_bit_bytes:]
+    for i in range(0, len(extras), 2):
+        edges.append((extras[i], extras[i + 1]))
+    return sorted(edges)
+
+class TableEntry(NamedTuple):
+    value: int
+    bound: str
+    depth: int
+    best_move: Optional[Move]
+
+class Probe(NamedTuple):
+    value: Optional[int]
+    alpha: int
+    beta: int
+    best_move: Optional[Move]
+
+class TranspositionTable:
+    """Net scores keyed by canonical position key.
+
+    Each entry records whether its value is the exact score or only a lower
+    or upper bound on it (from a search that failed high or low), how many
+    edges deep the search below it went, and the best move found in
+    canonical vertex labels. Every entry is a proven fact about the position,
+    so entries can be saved and reused by later runs.
+
+    `num_probes` and `num_hits` count the probes made and the ones the table
+    settled without a search, and `peak_entries` is the most entries it has
+    held at once, eviction or not.
+
+    The table can be capped by entry count and/or by an estimate of the
+    bytes it holds. Going over a cap evicts entries down to
+    `eviction_fraction` of it. Half of the survivors are the entries with
+    the most edges left to search (the shallow, expensive positions, exact
+    scores before bounds) and the rest are the most recently written.
+    Dropping an entry only costs a repeated search.
+
+    A persistent store (see `memo_store.MemoStore`) can sit behind the
+    table. Keys missing from memory are then looked up in it one at a time,
+    and up to `max_missing` keys the store turned out not to have are
+    remembered, so a position searched for the first time is looked up
+    once rather than on every probe and store. With `write_back` set, new
+    entries are written to it in batches of `batch_size`, on eviction and
+    on `flush`.
+    """
+
+    def __init__(self,
+        max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+        eviction_fraction: float = 0.75
+    ) -> None:
+        self._entries: Dict[bytes, TableEntry] = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_fraction = eviction_fraction
+        self.num_bytes = 0
+        self.num_evicted = 0
+        self.peak_entries = 0
+        self.num_probes = 0
+        self.num_hits = 0
+        self.backing_store = None
+        self.write_back = False
+        self.batch_size = 0
+        self._dirty: Set[bytes] = set()
+        self.max_missing = 1 << 16
+        self._missing: Set[bytes] = set()
+
+    def attach_store(self,
+        store, write_back: bool = False, batch_size: int = 10000
+    ) -> None:
+        self.backing_store = store
+        self.write_back = write_back
+        self.batch_size = batch_size
+
+    def flush(self) -> None:
+        """Write every entry added since the last flush to the store."""
+        if self._dirty:
+            self.backing_store.put_many(
+                (key, self._entries[key]) for key in self._dirty
+            )
+            self._dirty.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: bytes) -> bool:
+        return self.get(key) is not None
+
+    def items(self) -> Iterator[Tuple[bytes, TableEntry]]:
+        return iter(self._entries.items())
+
+    def get(self, key: bytes) -> Optional[TableEntry]:
+        entry = self._entries.get(key)
+        if (
+            entry is None and self.backing_store is not None
+            and key not in self._missing
+        ):
+            entry = self.backing_store.get(key)
+            if entry is not None:
+                self._insert(key, entry)
+            else:
+                if len(self._missing) >= self.max_missing:
+                    self._missing.clear()
+                self._missing.add(key)
+        return entry
+
+    def hit_summary(self) -> str:
+        rate = self.num_hits / self.num_probes if self.num_probes else 0.0
+        return (
+            f'memo probes:{self.num_probes} hits:{self.num_hits} ' +
+            f'({rate:.1%}) entries:{len(self)} ' +
+            f'evicted:{self.num_evicted}'
+        )
+
+    def put(self, key: bytes, entry: TableEntry) -> None:
+        if self.write_back:
+            self._dirty.add(key)
+        self._insert(key, entry)
+        if self.write_back and len(self._dirty) >= self.batch_size:
+            self.flush()
+
+    def _insert(self, key: bytes, entry: TableEntry) -> None:
+        # Every entry the store gets passes through here first, so once a
+        # key is inserted it can't be known to be missing any more.
+        if self._missing:
+            self._missing.discard(key)
+        # Re-inserting keeps the dict in order of when entries were written.
+        if self._entries.pop(key, None) is None:
+            self.num_bytes += sys.getsizeof(key) + _ENTRY_OVERHEAD_BYTES
+        self._entries[key] = entry
+        if len(self._entries) > self.peak_entries:
+            self.peak_entries = len(self._entries)
+        if (
+            self.max_entries is not None
+            and len(self._entries) > self.max_entries
+            or self.max_bytes is not None and self.num_bytes > self.max_bytes
+        ):
+            self._evict()
+
+    def _evict(self) -> None:
+        max_entries = len(self._entries)
+        if self.max_entries is not None:
+            max_entries = min(max_entries, self.max_entries)
+        if self.max_bytes is not None:
+            bytes_per_entry = self.num_bytes / len(self._entries)
+            max_entries = min(
+                max_entries, int(self.max_bytes / bytes_per_entry)
+            )
+        num_kept = int(max_entries * self.eviction_fraction)
+        # Half of what is kept goes to the most expensive entries; the rest
+        # to the most recently written, which the search is still working
+        # near and would otherwise thrash on.
+        ranked = sorted(
+            self._entries,
+            key=lambda key: (
+                self._entries[key].depth, self._entries[key].bound == EXACT
+            ),
+            reverse=True
+        )
+        kept = set(ranked[:num_kept // 2])
+        for key in reversed(self._entries):
+            if len(kept) >= num_kept:
+                break
+            kept.add(key)
+        evicted = [key for key in self._entries if key not in kept]
+        if self._dirty:
+            self.backing_store.put_many(
+                (key, self._entries[key]) for key in evicted
+                if key in self._dirty
+            )
+            self._dirty.difference_update(evicted)
+        for key in evicted:
+            del self._entries[key]
+            self.num_bytes -= sys.getsizeof(key) + _ENTRY_OVERHEAD_BYTES
+        self.num_evicted += len(evicted)
+
+    def probe(self, key: bytes, depth: int, alpha: int, beta: int) -> Probe:
+        """Look up `key` for a search of `depth` edges within (alpha, beta).
+
+        The returned value is set when the entry settles the search: an
+        exact score, or a bound that is already outside the window.
+        Otherwise the window comes back narrowed by whatever bound is known.
+        """
+        self.num_probes += 1
+        entry = self.get(key)
+        if entry is None:
+            return Probe(None, alpha, beta, None)
+        if entry.depth >= depth:
+            if (
+                entry.bound == EXACT
+                or entry.bound == LOWER and entry.value >= beta
+                or entry.bound == UPPER and entry.value <= alpha
+            ):
+                self.num_hits += 1
+                return Probe(entry.value, alpha, beta, entry.best_move)
+            if entry.bound == LOWER:
+                alpha = max(alpha, entry.value)
+            else:
+                beta = min(beta, entry.value)
+        return Probe(None, alpha, beta, entry.best_move)
+
+    def store(self,
+        key: bytes, value: int, depth: int, alpha: int, beta: int,
+        best_move: Optional[Move]
+    ) -> None:
+        """Record the result of a fail-soft search of `key` in (alpha, beta)."""
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        prior = self.get(key)
+        if prior is not None and prior.depth == depth:
+            if prior.bound == EXACT:
+                return
+            if prior.bound != bound and prior.value == value:
+                bound = EXACT
+        self.put(key, TableEntry(value, bound, depth, best_move))